@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+
+import numpy as np
+
+
+def normalize_question(question):
+    return " ".join(question.lower().split())
+
+
+class SemanticAnswerCache:
+    """Answers keyed by (document fingerprint, question), matched exactly or by embedding similarity.
+
+    A question is a hit if its normalized text was asked before, or if its embedding has
+    cosine similarity >= threshold with a cached question about the same document.
+    Entries expire after ttl seconds and the least recently used ones are dropped past
+    max_entries. One instance can be shared by every session in the process.
+    """
+
+    def __init__(self, threshold=0.95, ttl=24 * 3600, max_entries=1000):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._ids = count()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        for entry_id in [entry_id for entry_id, entry in self._entries.items() if now - entry["created"] > self.ttl]:
+            del self._entries[entry_id]
+
+    def lookup(self, doc_fingerprint, question, embed):
+        """Return (answer or None, question embedding or None).
+
+        embed(question) is only called when there is no exact-text hit and some cached
+        question about this document has an embedding to compare against. The embedding is
+        returned when computed, so the caller can reuse it for retrieval or store().
+        """
+        key = normalize_question(question)
+        with self._lock:
+            self._expire(time.time())
+            for entry_id, entry in self._entries.items():
+                if entry["doc"] == doc_fingerprint and entry["question"] == key:
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return entry["answer"], None
+            has_candidates = any(
+                entry["doc"] == doc_fingerprint and entry["embedding"] is not None for entry in self._entries.values()
+            )
+            if not has_candidates:
+                self.misses += 1
+                return None, None
+
+        embedding = np.asarray(embed(question), dtype=np.float32)
+        embedding /= np.linalg.norm(embedding) or 1.0
+        with self._lock:
+            candidates = [
+                (entry_id, entry) for entry_id, entry in self._entries.items()
+                if entry["doc"] == doc_fingerprint and entry["embedding"] is not None
+            ]
+            if candidates:
+                scores = np.stack([entry["embedding"] for _, entry in candidates]) @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    self.semantic_hits += 1
+                    return entry["answer"], embedding
+            self.misses += 1
+        return None, embedding
+
+    def store(self, doc_fingerprint, question, embedding, answer):
+        """Cache an answer. Without an embedding it can only be hit by the same question text."""
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        with self._lock:
+            self._entries[next(self._ids)] = {
+                "doc": doc_fingerprint,
+                "question": normalize_question(question),
+                "embedding": embedding,
+                "answer": answer,
+                "created": time.time(),
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
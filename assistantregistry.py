@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import threading
+
+REGISTRY_PATH = os.path.join("cache", "assistants.json")
+
+
+def assistant_key(model, instructions, tools):
+    """Stable hash of an Assistant's definition; any change to it yields a new key."""
+    definition = json.dumps({"model": model, "instructions": instructions, "tools": tools}, sort_keys=True)
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()
+
+
+class AssistantRegistry:
+    """Maps Assistant definitions to the ids of Assistants already created for them.
+
+    Ids are kept in a JSON file, so an Assistant is created once per definition rather
+    than on every Streamlit rerun, and later runs need no API call to find it.
+    """
+
+    def __init__(self, client, path=REGISTRY_PATH):
+        self.client = client
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                return json.load(f)
+        return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._ids, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get_or_create(self, model, instructions, tools, name=None):
+        """Return the id of the Assistant for this definition, creating it only the first time."""
+        key = assistant_key(model, instructions, tools)
+        with self._lock:
+            assistant_id = self._ids.get(key)
+            if assistant_id is None:
+                extra = {"name": name} if name else {}
+                assistant = self.client.beta.assistants.create(
+                    model=model, instructions=instructions, tools=tools, **extra
+                )
+                assistant_id = assistant.id
+                self._ids[key] = assistant_id
+                self._save()
+            return assistant_id
+
+    def forget(self, model, instructions, tools):
+        """Drop a stored id, e.g. after its Assistant was deleted, so the next lookup recreates it."""
+        with self._lock:
+            if self._ids.pop(assistant_key(model, instructions, tools), None) is not None:
+                self._save()
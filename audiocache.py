@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+AUDIO_CACHE_DIR = os.path.join("cache", "tts")
+
+
+def audio_key(model, voice, text, response_format="mp3"):
+    payload = json.dumps([model, voice, text, response_format])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed store of synthesized speech, one file per (model, voice, text, format).
+
+    A file's mtime is its last use; once the files add up to more than max_bytes the least
+    recently used are deleted. Safe to share between threads.
+    """
+
+    def __init__(self, root=AUDIO_CACHE_DIR, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._sizes = {
+            name: os.path.getsize(os.path.join(root, name))
+            for name in os.listdir(root) if not name.endswith(".tmp")
+        }
+
+    def path_for(self, key, response_format="mp3"):
+        return os.path.join(self.root, f"{key}.{response_format}")
+
+    def fetch(self, model, voice, text, file_path, synthesize, response_format="mp3"):
+        """Write the audio for this line to file_path, calling synthesize(tmp_path) only on a miss."""
+        path = self.path_for(audio_key(model, voice, text, response_format), response_format)
+        name = os.path.basename(path)
+        with self._lock:
+            hit = name in self._sizes and os.path.exists(path)
+            if hit:
+                self.hits += 1
+                os.utime(path)
+            else:
+                self.misses += 1
+        if not hit:
+            # Unique temp name: two threads may synthesize the same line at once
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                synthesize(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            with self._lock:
+                self._sizes[name] = os.path.getsize(path)
+                self._evict(keep=name)
+        if os.path.abspath(file_path) != os.path.abspath(path):
+            shutil.copyfile(path, file_path)
+        return file_path
+
+    def _evict(self, keep):
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_last_use = sorted(
+            self._sizes,
+            key=lambda name: os.path.getmtime(os.path.join(self.root, name))
+            if os.path.exists(os.path.join(self.root, name)) else 0.0,
+        )
+        for name in by_last_use:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            total -= self._sizes.pop(name)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._sizes),
+            "bytes": sum(self._sizes.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """The process-wide audio cache, so every page and TTSVoiceGen instance shares one index."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AudioCache()
+        return _cache
@@ -0,0 +1,107 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from metaindex import tokenize
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over a list of texts; ids are positions in that list."""
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.doc_lengths = []
+        term_counts = []
+        for text in texts:
+            counts = Counter(tokenize(text))
+            term_counts.append(counts)
+            self.doc_lengths.append(sum(counts.values()))
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+        # Postings store each document's precomputed tf/length weight, so a query only sums idf * weight
+        self.postings = defaultdict(list)
+        for doc_id, counts in enumerate(term_counts):
+            norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / (self.avg_length or 1.0))
+            for token, tf in counts.items():
+                self.postings[token].append((doc_id, tf * (k1 + 1) / (tf + norm)))
+        n = len(self.doc_lengths)
+        self.idf = {
+            token: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def search(self, query, k=10):
+        """Return up to k (doc_id, score) pairs, best first."""
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, weight in self.postings[token]:
+                scores[doc_id] += idf * weight
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def coverage(self, query, doc_id):
+        """Return (distinct query terms found in the document, distinct query terms)."""
+        terms = set(tokenize(query))
+        matched = sum(
+            1 for token in terms
+            if any(posting_id == doc_id for posting_id, _ in self.postings.get(token, ()))
+        )
+        return matched, len(terms)
+
+
+# Hits to fetch for is_decisive: it needs the runner-up, whatever k the caller wants back
+DECISIVE_PROBE_K = 2
+# Query terms the best hit must share (or all of them, for shorter queries) to be decisive
+MIN_DECISIVE_TERMS = 2
+
+
+def is_decisive(results, margin=2.0, coverage=None):
+    """True when the best sparse hit clearly beats the runner-up, so dense retrieval can be skipped.
+
+    results must come from a search with k >= DECISIVE_PROBE_K, or a lone hit looks decisive.
+    coverage is BM25Index.coverage() for the best hit; when given, a hit that shares a single
+    incidental word with a longer question is never decisive, even with no runner-up.
+    """
+    if not results:
+        return False
+    if coverage is not None:
+        matched, total = coverage
+        if matched < min(MIN_DECISIVE_TERMS, total):
+            return False
+    if len(results) == 1:
+        return True
+    return results[0][1] >= margin * results[1][1]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Merge several best-first lists of keys into one, scoring each key by sum(1 / (k + rank))."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda key: -scores[key])
+
+
+if __name__ == "__main__":
+    # Benchmark: build time and query latency on a synthetic corpus
+    import random
+    import time
+
+    random.seed(0)
+    vocabulary = [f"term{i}" for i in range(50_000)]
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    for n_docs in (10_000, 100_000):
+        texts = [" ".join(random.choices(vocabulary, weights, k=150)) for _ in range(n_docs)]
+        start = time.perf_counter()
+        index = BM25Index(texts)
+        build = time.perf_counter() - start
+        queries = [" ".join(random.choices(vocabulary, weights, k=4)) for _ in range(200)]
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, k=10)
+        per_query = (time.perf_counter() - start) / len(queries) * 1000
+        print(f"{n_docs:>7} docs: build {build:6.2f} s, query {per_query:7.2f} ms")
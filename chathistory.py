@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tokencount import count_tokens_batch
+
+# Per-message framing overhead in the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation so it can continue without the full transcript.
+Update the summary with the new messages. Keep names, facts, decisions, promises and unresolved threads;
+drop small talk and wording. Write at most {max_words} words of plain prose.
+
+Current summary:
+{summary}
+
+New messages:
+{transcript}"""
+
+# Summaries are refreshed off the request path; one small pool serves every session
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+
+class RollingHistory:
+    """Bounds the prompt for a growing chat: recent messages verbatim, older ones as a summary.
+
+    Leading system messages are always kept. The newest keep_messages messages are sent as
+    they are; anything older is folded into a running summary by a background request,
+    fold_every messages at a time, so a turn never waits on summarization. Messages that are
+    old but not yet summarized are still sent verbatim, and the oldest of them are dropped
+    first if the history would exceed max_history_tokens.
+
+    Store one instance per conversation (e.g. in st.session_state) next to the message list
+    it manages; the list itself stays the full transcript for display.
+    """
+
+    def __init__(self, client, model="gpt-4o-mini", keep_messages=8, fold_every=4,
+                 max_history_tokens=3000, summary_tokens=400):
+        self.client = client
+        self.model = model
+        self.keep_messages = keep_messages
+        self.fold_every = fold_every
+        self.max_history_tokens = max_history_tokens
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.summarized = 0  # messages after the pinned prefix that the summary covers
+        self.last_error = None
+        self._generation = 0  # bumped on reset so late summaries of old transcripts are ignored
+        self._pending = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _split(history):
+        pinned = 0
+        while pinned < len(history) and history[pinned]["role"] == "system":
+            pinned += 1
+        return history[:pinned], history[pinned:]
+
+    def reset(self):
+        with self._lock:
+            self._reset_locked()
+
+    def _reset_locked(self):
+        self.summary = ""
+        self.summarized = 0
+        self._generation += 1
+        self._pending = None
+
+    def build_messages(self, history):
+        """Return the messages to send for this history, using whatever summary is ready now."""
+        pinned, body = self._split(history)
+        with self._lock:
+            if self.summarized > len(body):
+                # The transcript was cleared or replaced underneath us
+                self._reset_locked()
+            summary, summarized = self.summary, self.summarized
+
+        recent = body[summarized:]
+        summary_messages = []
+        if summary:
+            summary_messages = [{"role": "system", "content": f"Summary of the conversation so far:\n{summary}"}]
+
+        texts = [m["content"] for m in summary_messages + recent]
+        costs = [tokens + MESSAGE_OVERHEAD_TOKENS for tokens in count_tokens_batch(texts, model=self.model)]
+        budget = self.max_history_tokens - sum(costs[:len(summary_messages)])
+        recent_costs = costs[len(summary_messages):]
+        # Keep the newest messages that fit; the latest one is always sent
+        start = len(recent)
+        while start > 0 and (start == len(recent) or recent_costs[start - 1] <= budget):
+            budget -= recent_costs[start - 1]
+            start -= 1
+        return [*pinned, *summary_messages, *recent[start:]]
+
+    def maybe_summarize(self, history):
+        """Fold messages that fell out of the verbatim window into the summary, in the background."""
+        _, body = self._split(history)
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return
+            cut = len(body) - self.keep_messages
+            if cut - self.summarized < self.fold_every:
+                return
+            start, summary = self.summarized, self.summary
+            self._pending = _executor.submit(
+                self._fold, list(body[start:cut]), summary, self._generation, start, cut
+            )
+
+    def _fold(self, messages, summary, generation, start, cut):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = SUMMARY_PROMPT.format(
+            max_words=int(self.summary_tokens * 0.75),
+            summary=summary or "(none yet)",
+            transcript=transcript,
+        )
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self.summary_tokens,
+                temperature=0,
+            )
+            new_summary = response.choices[0].message.content.strip()
+        except Exception as e:
+            # Keep the old summary; the unsummarized messages are still sent verbatim
+            self.last_error = e
+            return
+        with self._lock:
+            # Only apply if nobody reset or advanced the history meanwhile
+            if self._generation == generation and self.summarized == start:
+                self.summary, self.summarized = new_summary, cut
+                self.last_error = None
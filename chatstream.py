@@ -0,0 +1,69 @@
+import time
+
+
+class ChatStream:
+    """A streamed chat completion that yields text deltas as they arrive and times the response.
+
+    Pass it to st.write_stream to render tokens as they come in. Once iteration finishes,
+    text holds the full response and ttft / tokens_per_second describe how fast it arrived.
+    """
+
+    def __init__(self, client, model, messages, **kwargs):
+        self.client = client
+        self.model = model
+        self.messages = messages
+        self.kwargs = kwargs
+        self.text = ""
+        self.ttft = None
+        self.elapsed = None
+        self.completion_tokens = None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=self.messages,
+            stream=True,
+            # The final chunk then carries the real token usage
+            stream_options={"include_usage": True},
+            **self.kwargs,
+        )
+        parts = []
+        for chunk in stream:
+            if chunk.usage is not None:
+                self.completion_tokens = chunk.usage.completion_tokens
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - start
+                parts.append(delta)
+                yield delta
+        self.elapsed = time.perf_counter() - start
+        self.text = "".join(parts)
+        if self.completion_tokens is None:
+            # Usage was not reported; each content chunk is roughly one token
+            self.completion_tokens = len(parts)
+
+    @property
+    def tokens_per_second(self):
+        """Generation speed after the first token arrived."""
+        if self.elapsed is None or self.ttft is None:
+            return 0.0
+        generation_time = self.elapsed - self.ttft
+        return self.completion_tokens / generation_time if generation_time > 0 else 0.0
+
+    def stats(self):
+        return {
+            "ttft": self.ttft,
+            "elapsed": self.elapsed,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def summary(self):
+        if self.ttft is None:
+            return "No tokens received"
+        return (f"First token in {self.ttft * 1000:.0f} ms · {self.completion_tokens} tokens "
+                f"at {self.tokens_per_second:.1f} tokens/s")
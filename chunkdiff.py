@@ -0,0 +1,29 @@
+import hashlib
+from collections import Counter, namedtuple
+
+ChunkDiff = namedtuple("ChunkDiff", ["added", "removed", "kept"])
+
+
+def fingerprint_chunks(texts):
+    """Return a stable id per chunk: the sha256 of its text, suffixed with a count for repeated chunks."""
+    seen = Counter()
+    fingerprints = []
+    for text in texts:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        fingerprints.append(f"{digest}:{seen[digest]}")
+        seen[digest] += 1
+    return fingerprints
+
+
+def diff_chunks(old_fingerprints, new_fingerprints):
+    """Compare two chunk sets.
+
+    added holds positions in new_fingerprints that need embedding, removed holds old
+    fingerprints to delete from the index and kept holds positions that can be reused.
+    """
+    old = set(old_fingerprints)
+    new = set(new_fingerprints)
+    added = [i for i, fp in enumerate(new_fingerprints) if fp not in old]
+    kept = [i for i, fp in enumerate(new_fingerprints) if fp in old]
+    removed = [fp for fp in old_fingerprints if fp not in new]
+    return ChunkDiff(added, removed, kept)
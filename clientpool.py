@@ -0,0 +1,96 @@
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+import requests
+from openai import AsyncOpenAI, OpenAI
+from requests.adapters import HTTPAdapter
+
+# One set of connections per process: Streamlit re-runs page scripts on every
+# interaction, but imported modules (and these clients) survive the reruns.
+TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120.0)
+MAX_RETRIES = 2
+
+_lock = threading.Lock()
+_clients = {}
+# event loop -> {api_key: AsyncOpenAI}; entries go away with their loop
+_async_clients = weakref.WeakKeyDictionary()
+_session = None
+
+
+def _http2_available():
+    # httpx only speaks HTTP/2 when the optional h2 package is installed
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_client(api_key=None):
+    """Return the process-wide OpenAI client for this API key (default: $OPENAI_API_KEY)."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            http_client = httpx.Client(http2=_http2_available(), limits=LIMITS, timeout=TIMEOUT)
+            client = OpenAI(api_key=api_key, http_client=http_client, max_retries=MAX_RETRIES)
+            _clients[api_key] = client
+        return client
+
+
+def get_async_client(api_key=None):
+    """Return the shared AsyncOpenAI client for this API key and the running event loop.
+
+    Must be called from a coroutine. An async connection pool belongs to the loop that opened
+    it, so each loop gets its own, and clients of loops that have closed are dropped.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    loop = asyncio.get_running_loop()
+    with _lock:
+        # A pool's connections can keep their loop alive, so don't rely on the weak keys alone
+        for closed_loop in [other for other in _async_clients if other.is_closed()]:
+            del _async_clients[closed_loop]
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None:
+            http_client = httpx.AsyncClient(http2=_http2_available(), limits=LIMITS, timeout=TIMEOUT)
+            client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=MAX_RETRIES)
+            clients[api_key] = client
+        return client
+
+
+def get_http_session():
+    """Return a shared requests.Session with keep-alive pooling, for plain downloads such as image URLs."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+if __name__ == "__main__":
+    # Benchmark: per-call latency of a fresh client per call vs the shared pooled client.
+    # Makes real (free) models.list calls, so OPENAI_API_KEY must be set.
+    import time
+
+    calls = 10
+
+    def timed(make_client):
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            make_client().models.list()
+            latencies.append(time.perf_counter() - start)
+        return sorted(latencies)[calls // 2] * 1000
+
+    print(f"fresh OpenAI() per call: median {timed(lambda: OpenAI()):.0f} ms")
+    get_client().models.list()
+    print(f"pooled get_client():     median {timed(get_client):.0f} ms "
+          f"(http2={'on' if _http2_available() else 'off, pip install h2'})")
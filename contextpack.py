@@ -0,0 +1,40 @@
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16_385,
+    "gpt-4": 8_192,
+    "gpt-4-turbo": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4o-2024-08-06": 128_000,
+    "gpt-4o-mini": 128_000,
+}
+
+# Tokens allowed for the separator between packed chunks, plus a little slack for how
+# tokens merge at the seams when the pieces are joined
+SEPARATOR_TOKENS = 2
+
+
+def context_window(model, default=8_192):
+    return MODEL_CONTEXT_WINDOWS.get(model, default)
+
+
+def prompt_budget(model, max_tokens, overhead_tokens, max_context_tokens=None):
+    """Tokens left for context once the completion and the rest of the prompt are reserved."""
+    budget = context_window(model) - max_tokens - overhead_tokens
+    if max_context_tokens is not None:
+        budget = min(budget, max_context_tokens)
+    return max(budget, 0)
+
+
+def pack_context(chunks, token_counts, budget):
+    """Greedily take ranked chunks (best first) while they fit in budget.
+
+    Chunks that do not fit are skipped so a smaller, lower-ranked one can still use the
+    remaining room. Returns (selected chunks in rank order, tokens used).
+    """
+    selected = []
+    used = 0
+    for chunk, tokens in zip(chunks, token_counts):
+        cost = tokens + SEPARATOR_TOKENS
+        if used + cost <= budget:
+            selected.append(chunk)
+            used += cost
+    return selected, used
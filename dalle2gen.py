@@ -1,7 +1,8 @@
 import base64
 from io import BytesIO
 from PIL import Image
-import requests
+
+from clientpool import get_http_session
 
 
 class Dalle2Generator:
@@ -24,7 +25,7 @@ class Dalle2Generator:
                 return Image.open(BytesIO(base64.b64decode(image_data)))
             else:
                 image_url = images_response.data[0].url
-                response = requests.get(image_url)
+                response = get_http_session().get(image_url)
                 response.raise_for_status()
                 return Image.open(BytesIO(response.content))
 
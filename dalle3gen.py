@@ -1,7 +1,8 @@
-import requests
 from io import BytesIO
 from PIL import Image
 
+from clientpool import get_http_session
+
 
 class Dalle3Generator:
     def __init__(self, client):
@@ -19,7 +20,7 @@ class Dalle3Generator:
         try:
             images_response = self.client.images.generate(**image_params)
             image_url = images_response.data[0].url
-            response = requests.get(image_url)
+            response = get_http_session().get(image_url)
             response.raise_for_status()
             return Image.open(BytesIO(response.content))
 
@@ -0,0 +1,81 @@
+import os
+
+from embedbatch import BatchEmbedder
+
+# Set EMBED_BACKEND=local to embed on this machine instead of calling the OpenAI API
+BACKEND_ENV = "EMBED_BACKEND"
+BACKENDS = ["openai", "local"]
+DEFAULT_LOCAL_MODEL = "BAAI/bge-small-en-v1.5"
+
+
+class OpenAIBackend:
+    """Embeddings from the OpenAI API, sent in batched requests."""
+
+    name = "openai"
+
+    def __init__(self, model="text-embedding-3-small", client=None):
+        if client is None:
+            from clientpool import get_client
+            client = get_client()
+        self.model = model
+        self.embedder = BatchEmbedder(client, model=model)
+
+    def embed_documents(self, texts):
+        return self.embedder.embed_texts(list(texts))
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class LocalBackend:
+    """CPU-only embeddings computed in-process with fastembed (ONNX), no network after the model download."""
+
+    name = "local"
+
+    def __init__(self, model=DEFAULT_LOCAL_MODEL, batch_size=256, threads=None, parallel=0):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise ImportError("The local embedding backend needs fastembed: pip install fastembed") from e
+        self.model = model
+        self.batch_size = batch_size
+        # parallel=0 runs one worker per CPU core; None keeps everything in this process
+        self.parallel = parallel
+        self._model = TextEmbedding(model_name=model, threads=threads)
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        # Spawning workers costs more than it saves on small inputs
+        parallel = self.parallel if len(texts) >= 4 * self.batch_size else None
+        return [vector.tolist() for vector in self._model.embed(texts, batch_size=self.batch_size, parallel=parallel)]
+
+    def embed_query(self, text):
+        return next(iter(self._model.query_embed(text))).tolist()
+
+
+def backend_name(name=None):
+    """The backend to use: an explicit choice, else $EMBED_BACKEND, else openai."""
+    name = (name or os.getenv(BACKEND_ENV) or "openai").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}', expected one of {BACKENDS}")
+    return name
+
+
+def get_backend(name=None, **kwargs):
+    if backend_name(name) == "local":
+        return LocalBackend(**kwargs)
+    return OpenAIBackend(**kwargs)
+
+
+def embed_grouped_chunks(backend, grouped_chunks):
+    """Embed the output of get_text_chunks_grouped_by_page, tagging each vector with its page metadata."""
+    texts, metadata = [], []
+    for item in grouped_chunks:
+        for text in item['text_chunks']:
+            texts.append(text)
+            metadata.append(item['metadata'])
+    embeddings = backend.embed_documents(texts)
+    return [
+        {'text': text, 'metadata': meta, 'embedding': embedding}
+        for text, meta, embedding in zip(texts, metadata, embeddings)
+    ]
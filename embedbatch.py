@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tokencount import count_tokens_batch
+
+
+class BatchEmbedder:
+    """Packs text chunks into as few embedding requests as the API limits allow."""
+
+    def __init__(self, client, model="text-embedding-3-small", max_batch_tokens=100_000,
+                 max_batch_items=512, max_workers=4):
+        self.client = client
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+        self.max_workers = max_workers
+
+    def make_batches(self, texts):
+        """Group input positions into batches under the token and item limits."""
+        batches = []
+        current, current_tokens = [], 0
+        for i, tokens in enumerate(count_tokens_batch(texts, model=self.model)):
+            if current and (current_tokens + tokens > self.max_batch_tokens
+                            or len(current) >= self.max_batch_items):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, texts):
+        response = self.client.embeddings.create(input=texts, model=self.model)
+        # The API may return items out of order, so sort them back by index
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    def embed_texts(self, texts):
+        """Embed a flat list of texts, returning vectors in input order."""
+        texts = [text.replace("\n", " ") for text in texts]
+        batches = self.make_batches(texts)
+        embeddings = [None] * len(texts)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(lambda batch: self._embed_batch([texts[i] for i in batch]), batches)
+            for batch, vectors in zip(batches, results):
+                for i, vector in zip(batch, vectors):
+                    embeddings[i] = vector
+        return embeddings
+
+
+if __name__ == "__main__":
+    # Benchmark: throughput against chunk count, one request per chunk vs batched.
+    # Uses a fake client with a fixed per-request latency so no API calls are made.
+    import argparse
+    from types import SimpleNamespace
+
+    parser = argparse.ArgumentParser(description="Benchmark BatchEmbedder throughput")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per request")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    class FakeEmbeddingsClient:
+        def __init__(self, latency):
+            self.embeddings = self
+            self.latency = latency
+
+        def create(self, input, model):
+            time.sleep(self.latency)
+            return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[0.0] * 8) for i in range(len(input))])
+
+    client = FakeEmbeddingsClient(args.latency)
+    chunk = "The quick brown fox jumps over the lazy dog. " * 10
+    print(f"{'chunks':>8} {'sequential/s':>14} {'batched/s':>12} {'requests':>9}")
+    for n in (10, 100, 1000, 5000):
+        texts = [chunk] * n
+        sequential = BatchEmbedder(client, max_batch_items=1, max_workers=1)
+        batched = BatchEmbedder(client, max_workers=args.workers)
+        if n <= 1000:
+            start = time.perf_counter()
+            sequential.embed_texts(texts)
+            seq_rate = f"{n / (time.perf_counter() - start):14.1f}"
+        else:
+            seq_rate = f"{'skipped':>14}"
+        start = time.perf_counter()
+        batched.embed_texts(texts)
+        batch_rate = n / (time.perf_counter() - start)
+        print(f"{n:>8} {seq_rate} {batch_rate:12.1f} {len(batched.make_batches(texts)):>9}")
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from llama_index.core import StorageContext, load_index_from_storage
+
+FINGERPRINTS_FILE = "fingerprints.json"
+LAST_USED_FILE = ".last_used"
+
+
+def document_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IndexStorage:
+    """Persisted LlamaIndex indexes, one directory per document hash under root.
+
+    Indexes are only read from disk when their document is asked for. When the total
+    size passes max_bytes, the least recently used documents are deleted.
+    """
+
+    def __init__(self, root="storage", max_bytes=1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, doc_hash):
+        return os.path.join(self.root, doc_hash)
+
+    def _touch(self, path):
+        with open(os.path.join(path, LAST_USED_FILE), "w") as f:
+            f.write(str(time.time()))
+
+    def exists(self, doc_hash):
+        return os.path.exists(os.path.join(self.path_for(doc_hash), FINGERPRINTS_FILE))
+
+    def load(self, doc_hash):
+        """Return (index, chunk fingerprints) for a stored document, or (None, None)."""
+        if not self.exists(doc_hash):
+            return None, None
+        path = self.path_for(doc_hash)
+        index = load_index_from_storage(StorageContext.from_defaults(persist_dir=path))
+        with open(os.path.join(path, FINGERPRINTS_FILE), "r") as f:
+            fingerprints = json.load(f)
+        self._touch(path)
+        return index, fingerprints
+
+    def save(self, doc_hash, index, fingerprints):
+        path = self.path_for(doc_hash)
+        index.storage_context.persist(persist_dir=path)
+        # The fingerprints file is written last and marks the directory as complete
+        with open(os.path.join(path, FINGERPRINTS_FILE), "w") as f:
+            json.dump(fingerprints, f)
+        self._touch(path)
+        self.evict(keep=doc_hash)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(dirpath, filename))
+                for dirpath, _, filenames in os.walk(path) for filename in filenames
+            )
+            marker = os.path.join(path, LAST_USED_FILE)
+            last_used = os.path.getmtime(marker) if os.path.exists(marker) else 0.0
+            entries.append((last_used, size, name))
+        return entries
+
+    def evict(self, keep=None):
+        """Delete least recently used documents until the store fits in max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for last_used, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(self.path_for(name), ignore_errors=True)
+            total -= size
@@ -0,0 +1,72 @@
+import re
+from collections import defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+STOPWORDS = {"a", "an", "and", "are", "for", "in", "is", "of", "on", "or", "the", "to", "what", "with"}
+
+# Weight of an exact hit on each field; title token hits add up to roughly 1 each
+FIELD_WEIGHTS = {"section": 3.0, "chapter": 2.0, "page": 2.0}
+
+# A query that names a field outright: "page 4", "section 2.3", "ch. 1"
+NAMED_FIELD_RE = re.compile(r"\b(page|p|section|sec|chapter|ch)\.?\s*(\d+(?:\.\d+)*)\b")
+FIELD_ALIASES = {"p": "page", "sec": "section", "ch": "chapter"}
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+class MetadataIndex:
+    """Exact-match maps for page/chapter/section plus a token index over titles, built once per document."""
+
+    def __init__(self, metadatas=None):
+        self.fields = {field: defaultdict(list) for field in FIELD_WEIGHTS}
+        self.title_tokens = defaultdict(list)
+        self.titles = defaultdict(list)
+        for chunk_id, metadata in enumerate(metadatas or []):
+            self.add(chunk_id, metadata)
+
+    def add(self, chunk_id, metadata):
+        for field, postings in self.fields.items():
+            value = metadata.get(field)
+            if value not in (None, "", "Unknown"):
+                postings[str(value).lower()].append(chunk_id)
+        title_tokens = tokenize(metadata.get("title") or "")
+        if title_tokens:
+            self.titles[" ".join(title_tokens)].append(chunk_id)
+        for token in set(title_tokens):
+            self.title_tokens[token].append(chunk_id)
+
+    def named_matches(self, query):
+        """Return chunk ids for a query that names a page, chapter or section outright, or a whole title.
+
+        Only these are precise enough to answer from metadata alone; anything else should
+        go through lookup() and be fused with the other retrievers.
+        """
+        chunk_ids = []
+        for name, value in NAMED_FIELD_RE.findall(query.lower()):
+            chunk_ids.extend(self.fields[FIELD_ALIASES.get(name, name)].get(value, ()))
+        chunk_ids.extend(self.titles.get(" ".join(tokenize(query)), ()))
+        return list(dict.fromkeys(chunk_ids))
+
+    def lookup(self, query):
+        """Return chunk ids whose metadata loosely matches the query, best match first.
+
+        Any shared number or title word counts, so this is one ranked list among several,
+        not a replacement for text retrieval.
+        """
+        query = query.strip().lower()
+        # A query can name a field value outright ("2.3") or mention it ("what is in section 2.3")
+        candidates = {query, *tokenize(query)}
+        scores = defaultdict(float)
+        for field, postings in self.fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for value in candidates:
+                for chunk_id in postings.get(value, ()):
+                    scores[chunk_id] += weight
+        for token in set(tokenize(query)):
+            postings = self.title_tokens.get(token, ())
+            for chunk_id in postings:
+                # Rare title words say more about a chunk than ones shared by every title
+                scores[chunk_id] += 1.0 / len(postings)
+        return sorted(scores, key=lambda chunk_id: (-scores[chunk_id], chunk_id))
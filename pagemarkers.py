@@ -0,0 +1,66 @@
+import re
+from bisect import bisect_right
+
+MARKER_RE = re.compile(r"\[(start|end) of page (\d+)\]")
+
+
+class PageMap:
+    """Page boundaries of a text that uses [start of page N] / [end of page N] markers.
+
+    The text is scanned once. "[start of page N]" starts page N at the marker and
+    "[end of page N]" starts page N + 1 right after it; text before any marker is page 1.
+    Offsets are mapped to pages by binary search over the sorted boundary offsets.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.offsets = [0]
+        self.pages = [1]
+        self.markers = []
+        for match in MARKER_RE.finditer(text):
+            kind, number = match.group(1), int(match.group(2))
+            self.markers.append(match.span())
+            if kind == "start":
+                self._add_boundary(match.start(), number)
+            else:
+                self._add_boundary(match.end(), number + 1)
+
+    def _add_boundary(self, offset, page):
+        if offset == self.offsets[-1]:
+            self.pages[-1] = page
+        else:
+            self.offsets.append(offset)
+            self.pages.append(page)
+
+    @property
+    def page_count(self):
+        return len(set(self.pages))
+
+    def page_at(self, offset):
+        return self.pages[bisect_right(self.offsets, offset) - 1]
+
+    def page_range(self, start, end):
+        """Return (first_page, last_page) covered by text[start:end]."""
+        return self.page_at(start), self.page_at(max(start, end - 1))
+
+    def segments(self):
+        """Yield (page, start, end) for each stretch of text between markers."""
+        pos = 0
+        for marker_start, marker_end in self.markers + [(len(self.text), len(self.text))]:
+            if marker_start > pos:
+                yield self.page_at(pos), pos, marker_start
+            pos = marker_end
+
+
+def chunk_by_page(text, splitter):
+    """Split each page's text with splitter and group the chunks under their page number."""
+    page_map = PageMap(text)
+    grouped = {}
+    for page, start, end in page_map.segments():
+        spans = splitter.split_spans(text, start, end)
+        if spans:
+            grouped.setdefault(page, []).extend(text[s:e] for s, e in spans)
+    return [
+        {'metadata': {'page_number': str(page)}, 'text_chunks': chunks}
+        for page, chunks in grouped.items()
+    ]
@@ -1,37 +1,29 @@
 import streamlit as st
-import re
 import json
+import os
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from textsplit import TextSplitter
+from pagemarkers import chunk_by_page
 
 def get_text_chunks_grouped_by_page(text, verbose=True):
     if verbose:
         st.warning(f"Debug: The type of the input is {type(text)}")
         st.warning(f"Debug: The first 100 characters of the input are: {text[:100]}")
 
-    grouped_chunks = []
-
-    # Split by page markers and ensure valid text processing
-    pages = re.split(r'\[end of page \d+\]\s*\[start of page \d+\]', text)
-    for i, page in enumerate(pages, start=1):
-        if page.strip():  # Ensure non-empty
-            # Remove any remaining start/end markers
-            cleaned_text = re.sub(r'\[start of page \d+\]', '', page).strip()
-            cleaned_text = re.sub(r'\[end of page \d+\]', '', cleaned_text).strip()
+    # Further chunk the text if it's too long for one chunk
+    text_splitter = TextSplitter(
+        separator="\n",
+        chunk_size=500,  # Adjust chunk size as needed
+        chunk_overlap=100,  # Adjust overlap as needed
+        length_function=len
+    )
 
-            # Further chunk the text if it's too long for one chunk
-            text_splitter = CharacterTextSplitter(
-                separator="\n",
-                chunk_size=500,  # Adjust chunk size as needed
-                chunk_overlap=100,  # Adjust overlap as needed
-                length_function=len
-            )
-            chunks = text_splitter.split_text(cleaned_text)
-
-            # Group chunks under the same metadata
-            if chunks:
-                grouped_chunks.append({
-                    'metadata': {'page_number': str(i)},
-                    'text_chunks': [chunk.strip() for chunk in chunks if chunk.strip()]
-                })
+    # Scan the page markers once and group chunks under the same metadata
+    grouped_chunks = chunk_by_page(text, text_splitter)
 
     # Convert list to JSON
     json_output = json.dumps(grouped_chunks, indent=4)
@@ -41,23 +33,6 @@ def get_text_chunks_grouped_by_page(text, verbose=True):
 
     return json_output
 
-class CharacterTextSplitter:
-    def __init__(self, separator="\n", chunk_size=500, chunk_overlap=100, length_function=len):
-        self.separator = separator
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
-        self.length_function = length_function
-
-    def split_text(self, text):
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start += self.chunk_size - self.chunk_overlap
-        return chunks
-
 # Streamlit App
 st.title("Text Chunker and JSON Converter")
 
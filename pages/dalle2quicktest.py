@@ -5,9 +5,13 @@ from io import BytesIO
 import base64
 from PIL import Image
 
-# Set up OpenAI API key
-openai_api_key = os.getenv("OPENAI_API_KEY")
-client = openai.OpenAI(api_key=openai_api_key)
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+
+# Shared, pooled OpenAI client
+client = get_client()
 
 st.title("DALL-E 2 Image Generator")
 
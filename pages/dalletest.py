@@ -1,9 +1,7 @@
 import os
 import streamlit as st
-from openai import OpenAI
 from PIL import Image
 from io import BytesIO
-import requests
 
 # Add the root directory to the Python path
 import sys
@@ -12,10 +10,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # Import the DALL-E 2 and DALL-E 3 generator classes
 from dalle2gen import Dalle2Generator
 from dalle3gen import Dalle3Generator
+from clientpool import get_client, get_http_session
 
 # Load OpenAI API key from the environment variable
 openai_api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+client = get_client(openai_api_key)
 
 # Initialize the generators
 dalle2_generator = Dalle2Generator(client)
@@ -116,7 +115,7 @@ if st.button("Generate Image from Image and Text"):
                 n=1
             )
             image_url = response.data[0].url
-            modified_image = Image.open(BytesIO(requests.get(image_url).content))
+            modified_image = Image.open(BytesIO(get_http_session().get(image_url).content))
             st.image(modified_image, caption="Modified Image based on Input", use_column_width=True)
         except Exception as e:
             st.error(f"Failed to generate image: {e}")
@@ -144,7 +143,7 @@ if st.button("Inpaint Image"):
                 size=selected_config["size"],
                 n=1
             )
-            inpainted_image = Image.open(BytesIO(requests.get(response.data[0].url).content))
+            inpainted_image = Image.open(BytesIO(get_http_session().get(response.data[0].url).content))
             st.image(inpainted_image, caption="Inpainted Image", use_column_width=True)
         except Exception as e:
             st.error(f"Failed to inpaint image: {e}")
@@ -2,14 +2,19 @@
 import os
 import streamlit as st
 from pydantic import BaseModel
-from openai import OpenAI
 import json
 from pathlib import Path
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from structstream import stream_structured_items
 from pages.tts_voicegen import TTSVoiceGen
 
 # Load OpenAI API key from the environment variable
 openai_api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+client = get_client(openai_api_key)
 
 # Models for text generation
 gpt35 = "gpt-3.5-turbo"
@@ -87,57 +92,59 @@ if st.button("Generate Structured Dialogue"):
         )
 
         try:
-            # API call with structured output
-            completion = client.beta.chat.completions.parse(
-                model=gptomini,
-                messages=[
+            # Streamed API call with structured output; each line is handled (and voiced) as soon as
+            # it is complete, while the model is still writing the rest
+            lines = stream_structured_items(
+                client,
+                gptomini,
+                [
                     {"role": "system", "content": "Extract and structure the dialogue information."},
                     {"role": "user", "content": prompt},
                 ],
                 response_format=StructuredDialogue,
+                item_model=DialogueLine,
+                array_key="dialogues",
             )
-            
-            # Access the parsed response
-            structured_dialogue = completion.choices[0].message.parsed
 
             # Streamlit display for each dialogue
             st.write("### Parsed Dialogue:")
-            for dialogue in structured_dialogue.dialogues:
-                st.write(f"**Speaker**: {dialogue.speaker}")
-                st.write(f"**Dialogue**: {dialogue.dialogue}")
-                if generate_voice:
-                    file_path = Path(__file__).parent / f"{dialogue.speaker}_audio.mp3"
-                    try:
-                        # Fetch the speaker info
-                        speaker_info = tts_voicegen.get_speaker_info(dialogue.speaker) or tts_voicegen.get_speaker_info("default")
-                        
-                        # Determine model and voice
-                        model_to_use = speaker_info.get("voice_model", "tts-1")
-                        if model_to_use == "openai":
-                            model_to_use = "tts-1"
-                        voice_to_use = speaker_info.get("voice", "Unknown")
-                        
-                        # Verbose output before generation
-                        st.write(
-                            f"Generating audio with the following details:\n"
-                            f"Model: {model_to_use}\n"
-                            f"Voice: {voice_to_use}\n"
-                            f"Text: {dialogue.dialogue}\n"
-                            f"File Path: {file_path}\n"
+            dialogues = []
+            line_containers = []
+
+            def show_lines():
+                # Display each line as it streams in and pass it on for voicing
+                for dialogue in lines:
+                    dialogues.append(dialogue)
+                    container = st.container()
+                    container.write(f"**Speaker**: {dialogue.speaker}")
+                    container.write(f"**Dialogue**: {dialogue.dialogue}")
+                    line_containers.append(container)
+                    yield dialogue.speaker, dialogue.dialogue
+
+            if generate_voice:
+                # Voices are generated concurrently as lines arrive; each result comes back in script
+                # order and is placed under its line as soon as it and the lines before it are ready
+                for result in tts_voicegen.generate_audio_batch(show_lines(), Path(__file__).parent):
+                    container = line_containers[result["index"]]
+                    if result["error"]:
+                        container.error(
+                            f"Failed to generate voice for {result['speaker']}: {result['error']}\n"
+                            f"Model: {result['model']}\n"
+                            f"Voice: {result['voice']}\n"
+                            f"Text: {result['text']}\n"
+                            f"Attempts: {result['attempts']}\n"
                         )
-
-                        # Generate voice using TTSVoiceGen
-                        tts_voicegen.generate_audio(dialogue.speaker, dialogue.dialogue, file_path)
-                        st.audio(str(file_path), format="audio/mp3")
-
-                    except Exception as e:
-                        st.error(
-                            f"Failed to generate voice for {dialogue.speaker}: {e}\n"
-                            f"Model: {model_to_use}\n"
-                            f"Voice: {voice_to_use}\n"
-                            f"Text: {dialogue.dialogue}\n"
-                            f"File Path: {file_path}\n"
+                    else:
+                        container.audio(str(result["file_path"]), format="audio/mp3")
+                        container.caption(
+                            f"{result['model']} / {result['voice']} · {result['seconds']:.2f} s · "
+                            f"{result['attempts']} attempt(s)"
                         )
+            else:
+                for _ in show_lines():
+                    pass
+
+            structured_dialogue = StructuredDialogue(dialogues=dialogues)
 
             # Show the real structured output for TTS or other processes
             st.write("### Structured Output for Processing:")
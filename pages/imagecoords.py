@@ -2,7 +2,11 @@ import os
 import base64
 import streamlit as st
 from PIL import Image, ImageDraw
-from openai import OpenAI
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
 
 # Models for text generation
 gpt35 = "gpt-3.5-turbo"
@@ -16,8 +20,8 @@ default_model = gptop
 
 class OpenAIStreamlitApp:
     def __init__(self):
-        # Initialize the OpenAI client with the API key from the environment variable
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Shared, pooled OpenAI client (API key from the environment variable)
+        self.client = get_client()
 
     def draw_rectangle(self, image_path, coords):
         """Draws a rectangle on the image based on the given coordinates."""
@@ -1,10 +1,20 @@
 import streamlit as st
 import openai
 from llama_index.core import VectorStoreIndex, Settings, Document
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.memory import ChatMemoryBuffer
 from llama_index.llms.openai import OpenAI
 import os
 from dotenv import load_dotenv
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chunkdiff import fingerprint_chunks, diff_chunks
+from answercache import SemanticAnswerCache
+from indexstore import IndexStorage, document_hash
+
 # Initialize the OpenAI client with the API key from the environment variable
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -26,10 +36,7 @@ if "messages" not in st.session_state.keys():  # Initialize the chat messages hi
         }
     ]
 
-@st.cache_resource(show_spinner=False)
-def create_index_from_text(pasted_text):
-    # Convert the pasted text into a Document format required by LlamaIndex
-    document = Document(text=pasted_text)
+def configure_llm():
     # Initialize the LLM settings
     Settings.llm = OpenAI(
         model="gpt-4o-mini",
@@ -38,15 +45,61 @@ def create_index_from_text(pasted_text):
         Your job is to answer questions based on the content of this document. 
         Keep your answers factual and related to the text. Do not provide information outside of the document's content.""",
     )
-    # Create a vector store index from the document
-    index = VectorStoreIndex.from_documents([document])
-    return index
+
+def split_paragraphs(text):
+    return [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+
+def create_index_from_text(pasted_text):
+    # Convert the pasted text into one Document per paragraph, identified by its fingerprint
+    paragraphs = split_paragraphs(pasted_text)
+    fingerprints = fingerprint_chunks(paragraphs)
+    documents = [Document(text=paragraph, id_=fp) for paragraph, fp in zip(paragraphs, fingerprints)]
+    # Create a vector store index from the documents
+    return VectorStoreIndex.from_documents(documents), fingerprints
+
+def update_index_from_text(index, old_fingerprints, pasted_text):
+    """Re-embed only the paragraphs that changed since the index was built and drop removed ones."""
+    paragraphs = split_paragraphs(pasted_text)
+    fingerprints = fingerprint_chunks(paragraphs)
+    diff = diff_chunks(old_fingerprints, fingerprints)
+    for fp in diff.removed:
+        index.delete_ref_doc(fp, delete_from_docstore=True)
+    for i in diff.added:
+        index.insert(Document(text=paragraphs[i], id_=fingerprints[i]))
+    return fingerprints
+
+@st.cache_resource
+def get_answer_cache():
+    """Answers shared by every session asking about the same text."""
+    return SemanticAnswerCache(threshold=0.95, ttl=24 * 3600, max_entries=1000)
+
+@st.cache_resource
+def get_index_storage():
+    """Persisted indexes for every pasted document, one directory per document hash."""
+    return IndexStorage(root="./storage")
 
 # Text input box for the user to paste their text
 pasted_text = st.text_area("Paste your text here:")
 
 if pasted_text:
-    index = create_index_from_text(pasted_text)
+    configure_llm()
+    storage = get_index_storage()
+    doc_fingerprint = document_hash(pasted_text)
+    # The index and its chunk fingerprints live side by side, in the session and on disk
+    if st.session_state.get("doc_hash") != doc_fingerprint:
+        index, fingerprints = storage.load(doc_fingerprint)
+        if index is None:
+            if "index" in st.session_state:
+                # An edit of the current document: embed only the changed paragraphs
+                index = st.session_state.index
+                fingerprints = update_index_from_text(index, st.session_state.fingerprints, pasted_text)
+            else:
+                index, fingerprints = create_index_from_text(pasted_text)
+            storage.save(doc_fingerprint, index, fingerprints)
+        st.session_state.index, st.session_state.fingerprints = index, fingerprints
+        st.session_state.doc_hash = doc_fingerprint
+        st.session_state.pop("chat_engine", None)
+    index = st.session_state.index
 else:
     index = None
 
@@ -54,8 +107,10 @@ if index is None:
     st.stop()
 
 if "chat_engine" not in st.session_state.keys():  # Initialize the chat engine
+    # Keep a handle on the engine's memory so turns answered from the cache can be recorded in it
+    st.session_state.chat_memory = ChatMemoryBuffer.from_defaults()
     st.session_state.chat_engine = index.as_chat_engine(
-        chat_mode="condense_question", verbose=True, streaming=True
+        chat_mode="condense_question", memory=st.session_state.chat_memory, verbose=True, streaming=True
     )
 
 if prompt := st.chat_input("Ask a question based on the pasted text"):  # Prompt for user input and save to chat history
@@ -68,8 +123,32 @@ for message in st.session_state.messages:  # Write message history to UI
 # If last message is not from assistant, generate a new response
 if st.session_state.messages[-1]["role"] != "assistant":
     with st.chat_message("assistant"):
-        response_stream = st.session_state.chat_engine.stream_chat(prompt)
-        st.write_stream(response_stream.response_gen)
-        message = {"role": "assistant", "content": response_stream.response}
+        # The engine condenses follow-ups using the conversation so far, so only an opening
+        # question stands on its own and can be shared through the answer cache
+        first_turn = not st.session_state.chat_memory.get_all()
+        answer, question_embedding = None, None
+        if first_turn:
+            # Repeated and near-duplicate opening questions about the same text are answered from the cache
+            answer, question_embedding = get_answer_cache().lookup(
+                doc_fingerprint, prompt, Settings.embed_model.get_query_embedding
+            )
+        if answer is not None:
+            st.write(answer)
+            # Record the cached turn so follow-up questions are condensed against it
+            st.session_state.chat_memory.put(ChatMessage(role=MessageRole.USER, content=prompt))
+            st.session_state.chat_memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=answer))
+        else:
+            response_stream = st.session_state.chat_engine.stream_chat(prompt)
+            st.write_stream(response_stream.response_gen)
+            answer = response_stream.response
+            if first_turn:
+                # The lookup skips embedding while no cached question has one; embed now so
+                # later near-duplicates of this question can match it
+                if question_embedding is None:
+                    question_embedding = Settings.embed_model.get_query_embedding(prompt)
+                get_answer_cache().store(doc_fingerprint, prompt, question_embedding, answer)
+        message = {"role": "assistant", "content": answer}
         # Add response to message history
         st.session_state.messages.append(message)
+
+st.sidebar.caption(f"Answer cache: {get_answer_cache().stats()}")
@@ -6,6 +6,12 @@ from llama_index.llms.openai import OpenAI
 import os
 from dotenv import load_dotenv
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedbackend import BACKENDS, DEFAULT_LOCAL_MODEL, backend_name
+
 # Initialize the OpenAI client with the API key from the environment variable
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -27,16 +33,25 @@ if "messages" not in st.session_state.keys():  # Initialize the chat messages hi
         }
     ]
 
-# Initialize the embedding model
-embedding_model = OpenAIEmbedding(model="text-embedding-3-small")
+# Initialize the embedding model, OpenAI or local CPU embeddings (defaults to $EMBED_BACKEND)
+selected_backend = st.sidebar.selectbox("Embedding backend", BACKENDS, index=BACKENDS.index(backend_name()))
+
+@st.cache_resource(show_spinner=False)
+def load_embedding_model(name):
+    if name == "local":
+        from llama_index.embeddings.fastembed import FastEmbedEmbedding
+        return FastEmbedEmbedding(model_name=DEFAULT_LOCAL_MODEL)
+    return OpenAIEmbedding(model="text-embedding-3-small")
+
+embedding_model = load_embedding_model(selected_backend)
 
 @st.cache_resource(show_spinner=False)
-def create_index_from_text(pasted_text):
+def create_index_from_text(pasted_text, backend):
     # Convert the pasted text into a Document format required by LlamaIndex
     document = Document(text=pasted_text)
     
     # Create a vector store index using the specified embedding model
-    index = VectorStoreIndex.from_documents([document], embedding_model=embedding_model)
+    index = VectorStoreIndex.from_documents([document], embed_model=load_embedding_model(backend))
     
     return index
 
@@ -44,7 +59,7 @@ def create_index_from_text(pasted_text):
 pasted_text = st.text_area("Paste your text here:")
 
 if pasted_text:
-    index = create_index_from_text(pasted_text)
+    index = create_index_from_text(pasted_text, selected_backend)
 else:
     index = None
 
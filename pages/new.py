@@ -1,7 +1,12 @@
+import os
 import streamlit as st
-import requests
 import base64
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_http_session
+
 # URLs of your audio files
 audio_sources = [
     "https://ai-scool.com/audio/mimi_intro.mp3",
@@ -11,7 +16,7 @@ audio_sources = [
 
 # Function to fetch and encode audio data to base64
 def fetch_and_encode_audio(url):
-    response = requests.get(url)
+    response = get_http_session().get(url)
     audio_data = response.content
     return base64.b64encode(audio_data).decode('utf-8')  
 
@@ -2,7 +2,12 @@ import os
 import base64
 import streamlit as st
 from PIL import Image
-from openai import OpenAI
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from chatstream import ChatStream
 
 # Models for text generation
 gpt35 = "gpt-3.5-turbo"
@@ -16,16 +21,16 @@ default_model = gptop
 
 class OpenAIStreamlitApp:
     def __init__(self):
-        # Initialize the OpenAI client with the API key from the environment variable
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Shared, pooled OpenAI client (API key from the environment variable)
+        self.client = get_client()
 
     def encode_image(self, image_path):
         """Encodes an image file as a base64 string."""
         with open(image_path, "rb") as image_file:
             return base64.b64encode(image_file.read()).decode("utf-8")
 
-    def generate_text(self, prompt, model, image_path=None):
-        """Uses the specified GPT model to generate a response based on the input prompt."""
+    def build_messages(self, prompt, image_path=None):
+        """Builds the chat messages for a prompt, with the image attached if one is given."""
         if image_path:
             base64_image = self.encode_image(image_path)
             messages = [
@@ -42,14 +47,21 @@ class OpenAIStreamlitApp:
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": prompt}
             ]
-        
+        return messages
+
+    def generate_text(self, prompt, model, image_path=None):
+        """Uses the specified GPT model to generate a response based on the input prompt."""
         response = self.client.chat.completions.create(
             model=model,
-            messages=messages,
+            messages=self.build_messages(prompt, image_path),
             max_tokens=150
         )
         return response.choices[0].message.content
 
+    def stream_text(self, prompt, model, image_path=None):
+        """Streams the GPT response; iterate it (e.g. with st.write_stream) to receive text as it arrives."""
+        return ChatStream(self.client, model, self.build_messages(prompt, image_path), max_tokens=150)
+
     def run(self):
         st.title('Image Upload and AI Text Generator')
 
@@ -74,8 +86,10 @@ class OpenAIStreamlitApp:
                 st.error("Please enter some prompt text.")
             else:
                 try:
-                    generated_text = self.generate_text(prompt_text, model_choice, image_path if uploaded_file else None)
-                    st.text_area("Generated Text:", value=generated_text, height=300)
+                    # Render the response as it streams in
+                    stream = self.stream_text(prompt_text, model_choice, image_path if uploaded_file else None)
+                    st.write_stream(stream)
+                    st.caption(stream.summary())
                     st.success("Text generated successfully.")
                 except Exception as e:
                     st.error(f"Error generating text: {e}")
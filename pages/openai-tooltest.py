@@ -1,6 +1,12 @@
 import os
 import streamlit as st
-from openai import OpenAI
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from assistantregistry import AssistantRegistry
+from toolruntime import ToolRuntime
 
 # Models for text generation
 gpt35 = "gpt-3.5-turbo"
@@ -9,34 +15,42 @@ gpto = "gpt-4o"
 gptop = "gpt-4o-2024-08-06"
 gptomini = "gpt-4o-mini"
 
+# Definition of the assistant with a tool to get the quantity of a specific fruit
+assistant_model = gptop
+assistant_instructions = "You are an assistant that can provide the quantity of specific fruits using a tool."
+assistant_tools = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_fruit_quantity",
+            "description": "Get the quantity of a specific fruit",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "fruit": {
+                        "type": "string",
+                        "description": "The name of the fruit, e.g., apple, pear"
+                    }
+                },
+                "required": ["fruit"]
+            }
+        }
+    }
+]
+
+@st.cache_resource
+def get_assistant_registry():
+    # Assistant ids persisted on disk, shared by every session of this process
+    return AssistantRegistry(get_client())
+
 class OpenAIStreamlitApp:
     def __init__(self):
-        # Initialize the OpenAI client with the API key from the environment variable
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Shared, pooled OpenAI client (API key from the environment variable)
+        self.client = get_client()
 
-        # Define the assistant with a tool to get the quantity of a specific fruit
-        self.assistant = self.client.beta.assistants.create(
-            instructions="You are an assistant that can provide the quantity of specific fruits using a tool.",
-            model="gpt-4o-2024-08-06",
-            tools=[
-                {
-                    "type": "function",
-                    "function": {
-                        "name": "get_fruit_quantity",
-                        "description": "Get the quantity of a specific fruit",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "fruit": {
-                                    "type": "string",
-                                    "description": "The name of the fruit, e.g., apple, pear"
-                                }
-                            },
-                            "required": ["fruit"]
-                        }
-                    }
-                }
-            ]
+        # Look up the assistant for this definition; it is only created the first time
+        self.assistant_id = get_assistant_registry().get_or_create(
+            assistant_model, assistant_instructions, assistant_tools
         )
 
         # Define a simple fruit quantity mapping
@@ -47,36 +61,20 @@ class OpenAIStreamlitApp:
             "orange": 45
         }
 
+        # Expose the fruit tool to chat completions; the model decides when to call it
+        self.tool_runtime = ToolRuntime()
+        self.tool_runtime.register(self.get_fruit_quantity, **assistant_tools[0]["function"])
+
     def generate_text(self, prompt, model):
-        """Uses the specified GPT model to generate a response based on the input prompt."""
-        response = self.client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
+        """Uses the specified GPT model to generate a response, running the fruit tool whenever the model calls it."""
+        self.tool_runtime.calls.clear()
+        return self.tool_runtime.chat(
+            self.client,
+            model,
+            [{"role": "user", "content": prompt}],
             max_tokens=150
         )
 
-        message_content = response.choices[0].message.content
-
-        # Check if the AI's response indicates it needs to use the fruit tool
-        if "apple" in prompt.lower() or "pear" in prompt.lower() or "banana" in prompt.lower() or "orange" in prompt.lower():
-            fruit = self.extract_fruit(prompt)
-            if fruit:
-                st.warning("Fruit tool used")
-                quantity = self.get_fruit_quantity(fruit)
-                return f"There are {quantity} {fruit}s."
-            else:
-                return message_content
-        else:
-            return message_content
-
-    def extract_fruit(self, prompt):
-        """Simple extraction of a fruit name from the prompt."""
-        fruits = ["apple", "pear", "banana", "orange"]
-        for fruit in fruits:
-            if fruit in prompt.lower():
-                return fruit
-        return None
-
     def get_fruit_quantity(self, fruit):
         """Uses the assistant's tool to get the quantity of a specific fruit."""
         return self.fruit_quantities.get(fruit.lower(), "Unknown")
@@ -99,6 +97,13 @@ class OpenAIStreamlitApp:
                 try:
                     generated_text = self.generate_text(prompt_text, model_choice)
                     st.text_area("Generated Text:", value=generated_text, height=300)
+                    if self.tool_runtime.calls:
+                        st.warning("Fruit tool used")
+                        st.table([
+                            {"Tool": call["tool"], "Arguments": call["arguments"],
+                             "Latency (ms)": round(call["seconds"] * 1000, 2), "Error": call["error"] or ""}
+                            for call in self.tool_runtime.calls
+                        ])
                     st.success("Text generated successfully.")
                 except Exception as e:
                     st.error(f"Error generating text: {e}")
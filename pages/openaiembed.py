@@ -1,77 +1,67 @@
 import streamlit as st
-import re
 import json
-from openai import OpenAI
+import hashlib
 import numpy as np
 import os
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-class CharacterTextSplitter:
-    def __init__(self, separator="\n", chunk_size=500, chunk_overlap=100, length_function=len):
-        self.separator = separator
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
-        self.length_function = length_function
-
-    def split_text(self, text):
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start += self.chunk_size - self.chunk_overlap
-        return chunks
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedbackend import BACKENDS, backend_name, get_backend, embed_grouped_chunks
+from vectorfile import VectorFile, write_vector_file
+from textsplit import TextSplitter
+from pagemarkers import chunk_by_page
+
+VECTOR_DIR = "vectors"
 
 def get_text_chunks_grouped_by_page(text, verbose=True):
     if verbose:
         st.warning(f"Debug: The type of the input is {type(text)}")
         st.warning(f"Debug: The first 100 characters of the input are: {text[:100]}")
 
-    grouped_chunks = []
-    text_splitter = CharacterTextSplitter()
-
-    # Split by page markers and ensure valid text processing
-    pages = re.split(r'\[end of page \d+\]\s*\[start of page \d+\]', text)
-    for i, page in enumerate(pages, start=1):
-        if page.strip():  # Ensure non-empty
-            cleaned_text = re.sub(r'\[start of page \d+\]', '', page).strip()
-            cleaned_text = re.sub(r'\[end of page \d+\]', '', cleaned_text).strip()
-            chunks = text_splitter.split_text(cleaned_text)
-
-            if chunks:
-                grouped_chunks.append({
-                    'metadata': {'page_number': str(i)},
-                    'text_chunks': [chunk.strip() for chunk in chunks if chunk.strip()]
-                })
+    # One pass over the page markers, then each page is split in place
+    grouped_chunks = chunk_by_page(text, TextSplitter())
 
     if verbose:
         st.warning(f"JSON output created with {len(grouped_chunks)} entries.")
     return grouped_chunks
 
-def get_embeddings(text_chunks):
-    embeddings = []
-    for item in text_chunks:
-        for text in item['text_chunks']:
-            text = text.replace("\n", " ")
-            try:
-                response = client.embeddings.create(input=[text], model="text-embedding-3-small")
-                if 'data' in response and response['data']:
-                    embeddings.append(response['data'][0]['embedding'])
-                else:
-                    st.error(f"Failed to retrieve embeddings for text: {text}")
-                    st.write(f"Received response: {response}")
-            except Exception as e:
-                st.error(f"An error occurred while retrieving embeddings: {str(e)}")
-                st.write(f"Failed text: {text}")
-    return embeddings
+@st.cache_resource
+def load_backend(name):
+    return get_backend(name)
+
+def get_embeddings(text_chunks, backend):
+    """Embed all chunks in batches, returning one record per chunk with its page metadata."""
+    try:
+        return embed_grouped_chunks(backend, text_chunks)
+    except Exception as e:
+        st.error(f"An error occurred while retrieving embeddings: {str(e)}")
+        return []
+
+def save_embeddings(records, source_text, model):
+    """Write embedding records to a vector file named after the model and source text's hash and return its path."""
+    path = os.path.join(VECTOR_DIR, hashlib.sha256(f"{model}\n{source_text}".encode("utf-8")).hexdigest()[:16] + ".vec")
+    write_vector_file(
+        path,
+        np.array([record['embedding'] for record in records], dtype=np.float32),
+        ids=[f"{record['metadata']['page_number']}-{i}" for i, record in enumerate(records)],
+        metadatas=[{**record['metadata'], 'text': record['text']} for record in records],
+        dtype="float16",
+    )
+    return path
+
+@st.cache_resource
+def open_vector_file(path, mtime):
+    """Memory-map a vector file once per process; mtime in the key picks up rewritten files."""
+    return VectorFile(path)
 
 
 # Streamlit interface
 st.title("Text Processing and Embedding with OpenAI")
 
+selected_backend = st.sidebar.selectbox("Embedding backend", BACKENDS, index=BACKENDS.index(backend_name()))
+
 example_text = st.text_area("Input Text", height=200, value="Your example text goes here.")
 
 if st.button("Chunk Text"):
@@ -80,12 +70,16 @@ if st.button("Chunk Text"):
 
 if st.button("Generate Embeddings"):
     chunked_data = get_text_chunks_grouped_by_page(example_text, verbose=False)
-    embeddings = get_embeddings(chunked_data)
-    st.session_state['embeddings'] = embeddings
-    st.success("Embeddings generated and stored in session state.")
+    backend = load_backend(selected_backend)
+    embeddings = get_embeddings(chunked_data, backend)
+    if embeddings:
+        path = save_embeddings(embeddings, example_text, backend.model)
+        st.session_state['vector_file'] = path
+        vector_file = open_vector_file(path, os.path.getmtime(path))
+        st.success(f"{len(vector_file)} embeddings written to {path}.")
 
 if st.button("Query Embeddings"):
-    if 'embeddings' in st.session_state:
+    if 'vector_file' in st.session_state:
         query = st.text_input("Enter your query:")
         if query:
             # Assume a function to handle querying embeddings
@@ -1,46 +1,82 @@
 import os
 import openai
 import streamlit as st
-import numpy as np
-from scipy.spatial.distance import cosine
-from openai import OpenAI
-import tiktoken  # For token count
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedcache import EmbeddingCache
+from embedbackend import BACKENDS, backend_name, get_backend
+from tokencount import count_tokens, count_tokens_batch
+from contextpack import context_window, prompt_budget, pack_context
+from vectorsearch import SimilarityIndex
+from clientpool import get_client
+
+@st.cache_resource
+def get_embedding_cache():
+    """One on-disk embedding cache per process, shared across reruns and sessions."""
+    return EmbeddingCache()
+
+@st.cache_resource
+def load_backend(name):
+    """One embedding backend per choice per process; the local one loads its model only once."""
+    return get_backend(name)
+
+ANSWER_PROMPT = """Use the below context to answer the question. If the answer cannot be found, write 'I don't know.'
+
+        Context:
+        {context}
+
+        Question: {question}
+        """
 
 class OpenAIStreamlitApp:
     def __init__(self):
-        # Initialize the OpenAI client with the API key from the environment variable
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-    def get_embedding(self, text, model="text-embedding-3-small"):
-        """Generate an embedding for the input text."""
-        response = openai.embeddings.create(
-            input=[text],
-            model=model
-        )
-        embedding = response.data[0].embedding
+        # Shared, pooled OpenAI client (API key from the environment variable)
+        self.client = get_client()
+        self.embeddings = load_backend(backend_name())
+
+    def get_embedding(self, text):
+        """Generate an embedding for a search query."""
+        # Queries go through embed_query (some local models prefix a query instruction) and
+        # are cached apart from passages
+        embedding = get_embedding_cache().get_or_embed(
+            [text], f"{self.embeddings.model}:query", lambda texts: [self.embeddings.embed_query(t) for t in texts]
+        )[0]
         st.write(f"Embedding summary: Length = {len(embedding)}, First 5 values = {embedding[:5]}")
         return embedding
 
-    def search_context(self, contexts, query, model="text-embedding-3-small"):
-        """Search the most relevant context based on the cosine similarity of embeddings."""
-        query_embedding = self.get_embedding(query, model=model)
-        similarities = [
-            1 - cosine(np.array(self.get_embedding(context, model=model)), np.array(query_embedding))
-            for context in contexts
-        ]
-        top_index = np.argmax(similarities)
-        return contexts[top_index]
+    def get_embeddings(self, texts):
+        """Embed several texts, only sending the ones missing from the on-disk cache to the backend."""
+        return get_embedding_cache().get_or_embed(texts, self.embeddings.model, self.embeddings.embed_documents)
+
+    def get_similarity_index(self, texts):
+        """Build (or reuse from this session) a similarity index and per-text token counts."""
+        key = (self.embeddings.model, hash(tuple(texts)))
+        cached = st.session_state.get("similarity_index")
+        if cached is None or cached[0] != key:
+            cached = (key, SimilarityIndex(self.get_embeddings(texts)), count_tokens_batch(texts))
+            st.session_state.similarity_index = cached
+        return cached[1], cached[2]
+
+    def search_context(self, contexts, query, k=1):
+        """Return the k most relevant (context, token count) pairs by cosine similarity, best first."""
+        index, token_counts = self.get_similarity_index(contexts)
+        scores, indices = index.search(self.get_embedding(query), k=k)
+        return [(contexts[i], token_counts[i]) for i in indices]
 
     def count_tokens(self, text, model="gpt-4o-mini"):
         """Count the number of tokens in the given text."""
-        enc = tiktoken.encoding_for_model(model)
-        return len(enc.encode(text))
+        return count_tokens(text, model=model)
 
-    def generate_text(self, prompt, model="gpt-4o-mini", max_tokens=1500):
+    def generate_text(self, prompt, model="gpt-4o-mini", max_tokens=1500, prompt_tokens=None):
         """Uses the specified GPT model to generate a response based on the input prompt."""
         try:
-            total_tokens = self.count_tokens(prompt, model=model) + max_tokens
-            if total_tokens > 8192:  # Example limit, adjust based on your model
+            if prompt_tokens is None:
+                prompt_tokens = self.count_tokens(prompt, model=model)
+            total_tokens = prompt_tokens + max_tokens
+            if total_tokens > context_window(model):
                 raise ValueError(f"Total token count exceeds the model's limit: {total_tokens} tokens")
 
             response = self.client.chat.completions.create(
@@ -55,31 +91,36 @@ class OpenAIStreamlitApp:
         except Exception as e:
             st.error(f"Error generating text: {str(e)}")
 
-    def generate_answer(self, context, question, model="gpt-4o-mini"):
-        """Generate an answer using the most relevant context."""
-        prompt = f"""Use the below context to answer the question. If the answer cannot be found, write 'I don't know.'
-
-        Context:
-        {context}
-
-        Question: {question}
-        """
-        return self.generate_text(prompt, model=model)
+    def generate_answer(self, ranked_contexts, question, model="gpt-4o-mini", max_tokens=1500):
+        """Generate an answer from as many of the ranked contexts as fit in the model's token budget."""
+        overhead = self.count_tokens(ANSWER_PROMPT.format(context="", question=question), model=model)
+        budget = prompt_budget(model, max_tokens, overhead)
+        contexts, context_tokens = pack_context(
+            [context for context, tokens in ranked_contexts],
+            [tokens for context, tokens in ranked_contexts],
+            budget,
+        )
+        prompt = ANSWER_PROMPT.format(context="\n\n".join(contexts), question=question)
+        return self.generate_text(prompt, model=model, max_tokens=max_tokens, prompt_tokens=overhead + context_tokens)
 
     def run(self):
         st.title("Question Answering with OpenAI Embeddings")
+        selected_backend = st.sidebar.selectbox("Embedding backend", BACKENDS, index=BACKENDS.index(backend_name()))
+        self.embeddings = load_backend(selected_backend)
+        st.sidebar.caption(f"Embedding cache: {get_embedding_cache().stats()}")
 
         text_input = st.text_area("Text Contexts", height=200)
         contexts = text_input.split("\n\n")
 
         question = st.text_input("Enter your question:")
+        top_k = st.slider("Contexts to consider", min_value=1, max_value=20, value=5)
 
         if st.button("Get Answer"):
             if contexts and question:
                 with st.spinner('Searching for the most relevant context...'):
-                    best_context = self.search_context(contexts, question)
+                    ranked_contexts = self.search_context(contexts, question, k=top_k)
                     with st.spinner('Generating the answer...'):
-                        answer = self.generate_answer(best_context, question)
+                        answer = self.generate_answer(ranked_contexts, question)
                         if answer:
                             st.write("Answer:", answer)
             else:
@@ -1,23 +1,57 @@
 #langchain and openai embedding faiss vectorstore working
 import os
 import streamlit as st
-import openai
-import faiss
-import numpy as np
 from langchain.docstore.in_memory import InMemoryDocstore
 from langchain.vectorstores import FAISS
-from langchain.embeddings.openai import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from uuid import uuid4
-from scipy.spatial.distance import cosine
-import tiktoken
 import re
+import hashlib
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedcache import EmbeddingCache
+from embedbackend import BACKENDS, backend_name, get_backend
+from tokencount import count_tokens, count_tokens_batch
+from clientpool import get_client
+from contextpack import context_window, prompt_budget, pack_context
+from metaindex import MetadataIndex
+from pagemarkers import PageMap
+from faissindex import INDEX_TYPES, build_index, train_index, set_search_params, supports_removal
+from chunkdiff import fingerprint_chunks, diff_chunks
+from bm25 import BM25Index, DECISIVE_PROBE_K, is_decisive, reciprocal_rank_fusion
+from answercache import SemanticAnswerCache
+
+@st.cache_resource
+def get_embedding_cache():
+    """One on-disk embedding cache per process, shared across reruns and sessions."""
+    return EmbeddingCache()
+
+@st.cache_resource
+def load_backend(name):
+    """One embedding backend per choice per process; the local one loads its model only once."""
+    return get_backend(name)
+
+@st.cache_resource
+def get_answer_cache():
+    """Answers shared by every session asking about the same document."""
+    return SemanticAnswerCache(threshold=0.95, ttl=24 * 3600, max_entries=1000)
+
+ANSWER_PROMPT = """Based on the following context, answer the question as accurately as possible. If the answer isn't directly available, try to infer from the information provided.
+
+        Context:
+        {context}
+
+        Question: {question}
+
+        Provide the most relevant information available."""
 
 class OpenAIStreamlitApp:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        self.client = get_client()
+        self.embeddings = load_backend(backend_name())
 
     def analyze_metadata(self, text, current_page):
         section_info = self.extract_section_info(text)
@@ -40,83 +74,129 @@ class OpenAIStreamlitApp:
         return {"chapter": None, "section": None, "title": None}
 
     def chunk_text(self, text):
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        chunks = splitter.split_text(text)
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, add_start_index=True)
+        chunks = splitter.create_documents([text])
+        page_map = PageMap(text)
+
+        # Token counts are taken once here so answering never re-tokenizes the assembled prompt
+        token_counts = count_tokens_batch([chunk.page_content for chunk in chunks])
 
         documents = []
-        current_page = 1
         for i, chunk in enumerate(chunks):
-            current_page = self.get_current_page(chunk, current_page)
-            metadata = self.analyze_metadata(chunk, current_page)
-            document = Document(page_content=chunk, metadata=metadata)
+            # Like the old marker tracking, a chunk spanning pages is tagged with the page it ends on
+            start = chunk.metadata["start_index"]
+            _, current_page = page_map.page_range(start, start + len(chunk.page_content))
+            metadata = self.analyze_metadata(chunk.page_content, current_page)
+            metadata["token_count"] = token_counts[i]
+            document = Document(page_content=chunk.page_content, metadata=metadata)
             documents.append(document)
-            st.info(f"Chunk {i + 1}: {chunk}\nMetadata: {metadata}")
+            st.info(f"Chunk {i + 1}: {chunk.page_content}\nMetadata: {metadata}")
         
         st.info(f"Total {len(documents)} documents created.")
         return documents
 
-    def get_current_page(self, chunk, current_page):
-        """Update the current page based on the presence of page markers in the chunk."""
-        start_page_markers = re.findall(r"\[start of page (\d+)\]", chunk)
-        end_page_markers = re.findall(r"\[end of page (\d+)\]", chunk)
-
-        if start_page_markers:
-            current_page = int(start_page_markers[-1])
-        elif end_page_markers:
-            current_page = int(end_page_markers[-1]) + 1
-        return current_page
-
-    def create_vectorstore(self, documents):
-        sample_embedding = self.embeddings.embed_query("sample text")
-        embedding_dim = len(sample_embedding)
-        index = faiss.IndexFlatL2(embedding_dim)
+    def create_vectorstore(self, documents, index_type="flat", **index_params):
+        texts = [doc.page_content for doc in documents]
+        if not texts:
+            raise ValueError("Cannot build a vector store without any chunks")
+        embeddings = self.get_embeddings(texts)
+        index = build_index(len(embeddings[0]), index_type, n_vectors=len(embeddings), **index_params)
+        train_index(index, embeddings)
         vector_store = FAISS(
             embedding_function=self.embeddings,
             index=index,
             docstore=InMemoryDocstore(),
             index_to_docstore_id={},
         )
-        uuids = [str(uuid4()) for _ in range(len(documents))]
-        vector_store.add_documents(documents=documents, ids=uuids)
-        st.info("Vectorstore created and documents added.")
+        # Chunk fingerprints double as docstore ids so a later edit can be diffed against them
+        vector_store.add_embeddings(
+            text_embeddings=list(zip(texts, embeddings)),
+            metadatas=[doc.metadata for doc in documents],
+            ids=fingerprint_chunks(texts),
+        )
+        st.info(f"Vectorstore created with a {index_type} index and documents added.")
         return vector_store
 
-    def get_embedding(self, text, model="text-embedding-3-small"):
-        response = openai.embeddings.create(input=[text], model=model)
-        embedding = response.data[0].embedding
+    def update_vectorstore(self, vector_store, documents):
+        """Bring an existing vector store in line with a re-chunked document, embedding only new chunks.
+
+        Returns None when the index cannot delete vectors and chunks were removed, in which
+        case the caller should rebuild it.
+        """
+        old_fingerprints = list(vector_store.index_to_docstore_id.values())
+        new_fingerprints = fingerprint_chunks([doc.page_content for doc in documents])
+        diff = diff_chunks(old_fingerprints, new_fingerprints)
+        if diff.removed:
+            if not supports_removal(vector_store.index):
+                return None
+            vector_store.delete(ids=diff.removed)
+        for i in diff.kept:
+            # Text is unchanged but page/section metadata may have shifted with the edit
+            vector_store.docstore.delete([new_fingerprints[i]])
+            vector_store.docstore.add({new_fingerprints[i]: documents[i]})
+        if diff.added:
+            texts = [documents[i].page_content for i in diff.added]
+            vector_store.add_embeddings(
+                text_embeddings=list(zip(texts, self.get_embeddings(texts))),
+                metadatas=[documents[i].metadata for i in diff.added],
+                ids=[new_fingerprints[i] for i in diff.added],
+            )
+        st.info(f"Vectorstore updated: {len(diff.added)} chunks embedded, {len(diff.removed)} removed, {len(diff.kept)} reused.")
+        return vector_store
+
+    def get_embedding(self, text):
+        # Queries go through embed_query (some local models prefix a query instruction) and
+        # are cached apart from passages
+        embedding = get_embedding_cache().get_or_embed(
+            [text], f"{self.embeddings.model}:query", lambda texts: [self.embeddings.embed_query(t) for t in texts]
+        )[0]
         st.write(f"Embedding summary: Length = {len(embedding)}, First 5 values = {embedding[:5]}")
         return embedding
 
+    def get_embeddings(self, texts):
+        """Embed several texts, only sending the ones missing from the on-disk cache to the backend."""
+        return get_embedding_cache().get_or_embed(texts, self.embeddings.model, self.embeddings.embed_documents)
+
     def count_tokens(self, text, model="gpt-4o-mini"):
         """Count the number of tokens in the given text using the specified model."""
-        enc = tiktoken.encoding_for_model(model)
-        return len(enc.encode(text))
-
-    def search_context(self, documents, query, model="text-embedding-3-small"):
-        relevant_context = ""
-        for doc in documents:
-            if (
-                query.lower() in (doc.metadata.get("chapter") or "").lower() or
-                query.lower() in (doc.metadata.get("section") or "").lower() or
-                query.lower() in (doc.metadata.get("title") or "").lower() or
-                query.lower() in str(doc.metadata.get("page", "")).lower()
-            ):
-                relevant_context += doc.page_content + "\n"
-
-        if relevant_context.strip():
-            return relevant_context.strip()
-
-        query_embedding = self.get_embedding(query, model=model)
-        similarities = [
-            1 - cosine(np.array(self.get_embedding(doc.page_content, model=model)), np.array(query_embedding))
-            for doc in documents
-        ]
-        top_index = np.argmax(similarities)
-        return documents[top_index].page_content
-
-    def generate_text(self, prompt, model="gpt-4o-mini", max_tokens=1500):
-        total_tokens = self.count_tokens(prompt, model=model) + max_tokens
-        if total_tokens > 8192:
+        return count_tokens(text, model=model)
+
+    def search_context(self, documents, query, vector_store, meta_index, bm25, k=1, search_params=None, embed_query=None):
+        """Rank chunks for a query; embed_query(query) is only called if dense search is needed."""
+        embed_query = embed_query or self.get_embedding
+        # A query naming a page/chapter/section or a whole title is answered from metadata alone
+        named = meta_index.named_matches(query)
+        if named:
+            return [documents[i] for i in named[:k]]
+
+        # A clear keyword winner (section numbers, names, identifiers) needs no embedding round trip
+        # Probe deep enough to see the runner-up even when only one chunk is wanted
+        probe = bm25.search(query, k=max(k, DECISIVE_PROBE_K))
+        sparse = probe[:k]
+        coverage = bm25.coverage(query, probe[0][0]) if probe else None
+        if is_decisive(probe, coverage=coverage):
+            return [documents[doc_id] for doc_id, score in sparse]
+
+        set_search_params(vector_store.index, **(search_params or {}))
+        results = vector_store.similarity_search_with_score_by_vector(embed_query(query), k=k)
+        dense = [doc for doc, score in results]
+        # Looser metadata hits (shared numbers, title words) are one more ranking to fuse
+        meta = [documents[i] for i in meta_index.lookup(query)[:k]]
+        by_text = {doc.page_content: doc for doc in dense}
+        by_text.update((documents[doc_id].page_content, documents[doc_id]) for doc_id, score in sparse)
+        by_text.update((doc.page_content, doc) for doc in meta)
+        fused = reciprocal_rank_fusion([
+            [doc.page_content for doc in dense],
+            [documents[doc_id].page_content for doc_id, score in sparse],
+            [doc.page_content for doc in meta],
+        ])
+        return [by_text[text] for text in fused[:k]]
+
+    def generate_text(self, prompt, model="gpt-4o-mini", max_tokens=1500, prompt_tokens=None):
+        if prompt_tokens is None:
+            prompt_tokens = self.count_tokens(prompt, model=model)
+        total_tokens = prompt_tokens + max_tokens
+        if total_tokens > context_window(model):
             raise ValueError(f"Total token count exceeds the model's limit: {total_tokens} tokens")
 
         response = self.client.chat.completions.create(
@@ -126,17 +206,16 @@ class OpenAIStreamlitApp:
         )
         return response.choices[0].message.content
 
-    def generate_answer(self, context, question, model="gpt-4o-mini"):
-        prompt = f"""Based on the following context, answer the question as accurately as possible. If the answer isn't directly available, try to infer from the information provided.
-
-        Context:
-        {context}
-
-        Question: {question}
-
-        Provide the most relevant information available."""
-    
-        return self.generate_text(prompt, model=model)
+    def generate_answer(self, documents, question, model="gpt-4o-mini", max_tokens=1500, max_context_tokens=None):
+        """Answer from as many of the ranked documents as fit in the model's token budget."""
+        overhead = self.count_tokens(ANSWER_PROMPT.format(context="", question=question), model=model)
+        budget = prompt_budget(model, max_tokens, overhead, max_context_tokens)
+        token_counts = [doc.metadata.get("token_count") for doc in documents]
+        if None in token_counts:
+            token_counts = count_tokens_batch([doc.page_content for doc in documents], model=model)
+        packed, context_tokens = pack_context([doc.page_content for doc in documents], token_counts, budget)
+        prompt = ANSWER_PROMPT.format(context="\n".join(packed), question=question)
+        return self.generate_text(prompt, model=model, max_tokens=max_tokens, prompt_tokens=overhead + context_tokens)
 
     def run(self):
         st.title("📄 Document Analysis and Retrieval-Augmented Generation (RAG) with FAISS")
@@ -145,6 +224,10 @@ class OpenAIStreamlitApp:
             st.session_state.vector_store = None
         if 'documents' not in st.session_state:
             st.session_state.documents = []
+        if 'meta_index' not in st.session_state:
+            st.session_state.meta_index = MetadataIndex()
+        if 'bm25' not in st.session_state:
+            st.session_state.bm25 = BM25Index([])
 
         with st.sidebar:
             st.header("Instructions")
@@ -153,16 +236,44 @@ class OpenAIStreamlitApp:
                  2. Click on **Process Document** to chunk and analyze it.
                  3. **Ask questions** about the document using the chat input at the bottom.
             """)
+            selected_backend = st.selectbox("Embedding backend", BACKENDS, index=BACKENDS.index(backend_name()))
+            self.embeddings = load_backend(selected_backend)
+            st.caption(f"Embedding cache: {get_embedding_cache().stats()}")
+            st.caption(f"Answer cache: {get_answer_cache().stats()}")
+
+            st.header("Vector Index")
+            index_type = st.selectbox("Index type", INDEX_TYPES, help="flat is exact; hnsw and ivf trade a little recall for sublinear search.")
+            index_params, search_params = {}, {}
+            if index_type == "hnsw":
+                index_params["hnsw_m"] = st.number_input("M (graph links per node)", 4, 128, 32)
+                index_params["ef_construction"] = st.number_input("efConstruction", 16, 1024, 200)
+                search_params["ef_search"] = st.number_input("efSearch (higher = better recall, slower)", 8, 1024, 64)
+            elif index_type == "ivf":
+                index_params["nlist"] = st.number_input("nlist (clusters)", 1, 65536, 100)
+                search_params["nprobe"] = st.number_input("nprobe (higher = better recall, slower)", 1, 1024, 8)
+            top_k = st.slider("Chunks to retrieve", 1, 50, 10)
+            max_context_tokens = st.number_input("Context token budget", 500, 120_000, 6_000, step=500)
 
         text_input = st.text_area("📋 Paste your document here", height=300)
 
         if st.button("✅ Process Document"):
-            if text_input:
+            # Whitespace-only input would chunk into nothing to index
+            if text_input.strip():
                 with st.spinner('🔄 Processing and chunking the document...'):
                     documents = self.chunk_text(text_input)
-                    vector_store = self.create_vectorstore(documents)
+                    index_config = (selected_backend, index_type, index_params)
+                    vector_store = None
+                    if st.session_state.vector_store and st.session_state.get("index_config") == index_config:
+                        vector_store = self.update_vectorstore(st.session_state.vector_store, documents)
+                    if vector_store is None:
+                        vector_store = self.create_vectorstore(documents, index_type, **index_params)
                     st.session_state.vector_store = vector_store
+                    st.session_state.index_config = index_config
                     st.session_state.documents = documents
+                    st.session_state.meta_index = MetadataIndex([doc.metadata for doc in documents])
+                    st.session_state.bm25 = BM25Index([doc.page_content for doc in documents])
+                    # Cached answers are only reused for the same text embedded by the same backend
+                    st.session_state.doc_fingerprint = f"{selected_backend}:" + hashlib.sha256(text_input.encode("utf-8")).hexdigest()
             else:
                 st.warning("Please paste a document to process.")
 
@@ -177,14 +288,33 @@ class OpenAIStreamlitApp:
         if st.session_state.vector_store:
             query = st.chat_input("💬 Enter your question here:")
             if query:
-                with st.spinner('🔍 Searching for relevant information...'):
-                    best_context = self.search_context(st.session_state.documents, query)
-                with st.spinner('🤖 Generating answer...'):
-                    answer = self.generate_answer(best_context, query)
+                # Queries must be embedded by the backend the store was built with
+                self.embeddings = load_backend(st.session_state.index_config[0])
+                # The query is embedded at most once, and only if the semantic cache check or
+                # dense search needs it; exact repeats and decisive BM25 hits never do
+                query_embeddings = {}
+
+                def embed_query(text):
+                    if text not in query_embeddings:
+                        query_embeddings[text] = self.get_embedding(text)
+                    return query_embeddings[text]
+
+                answer, _ = get_answer_cache().lookup(st.session_state.doc_fingerprint, query, embed_query)
+                if answer is None:
+                    with st.spinner('🔍 Searching for relevant information...'):
+                        ranked_documents = self.search_context(
+                            st.session_state.documents, query, st.session_state.vector_store, st.session_state.meta_index,
+                            st.session_state.bm25,
+                            k=top_k, search_params=search_params, embed_query=embed_query,
+                        )
+                    with st.spinner('🤖 Generating answer...'):
+                        answer = self.generate_answer(ranked_documents, query, max_context_tokens=max_context_tokens)
                     if answer:
-                        st.markdown(f"**Answer:** {answer}")
-                    else:
-                        st.markdown("**Answer:** Unable to generate an answer.")
+                        get_answer_cache().store(st.session_state.doc_fingerprint, query, query_embeddings.get(query), answer)
+                if answer:
+                    st.markdown(f"**Answer:** {answer}")
+                else:
+                    st.markdown("**Answer:** Unable to generate an answer.")
         else:
             st.info("⚠️ Please process a document first to enable question answering.")
 
@@ -7,32 +7,35 @@ logger = logging.getLogger()
 
 # Import statements with debugging
 try:
-    from llama_index import VectorStoreIndex
-    logger.info("VectorStoreIndex imported successfully")
+    from llama_index.core import VectorStoreIndex, Document
+    logger.info("VectorStoreIndex and Document imported successfully")
 except ImportError as e:
-    logger.error("Failed to import VectorStoreIndex:", exc_info=True)
-
-try:
-    from llama_index import SimpleDirectoryReader
-    logger.info("SimpleDirectoryReader imported successfully")
-except ImportError as e:
-    logger.error("Failed to import SimpleDirectoryReader:", exc_info=True)
-
-try:
-    from llama_index import ServiceContext, StorageContext
-    logger.info("ServiceContext and StorageContext imported successfully")
-except ImportError as e:
-    logger.error("Failed to import ServiceContext or StorageContext:", exc_info=True)
+    logger.error("Failed to import VectorStoreIndex or Document:", exc_info=True)
 
  
-import openai
 from dotenv import load_dotenv
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from indexstore import IndexStorage, document_hash
+from chunkdiff import fingerprint_chunks
+
 # Load environment variables (including the OpenAI API key)
 load_dotenv()
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Shared, pooled OpenAI client
+client = get_client()
+
+# Indexes persisted per document hash; kept apart from the llamaindex page's ./storage,
+# whose indexes are chunked differently
+STORAGE_ROOT = "./storage_docsearch"
+
+@st.cache_resource
+def get_index_storage():
+    """Persisted indexes for every pasted document, one directory per document hash."""
+    return IndexStorage(root=STORAGE_ROOT)
 
 # Streamlit application title
 st.title("Document Search with LlamaIndex and GPT-4o-mini")
@@ -42,28 +45,23 @@ document_text = st.text_area("Paste your document here:", height=300)
 
 # If the text area is not empty, process the document
 if document_text:
-    PERSIST_DIR = "./storage"
-    
-    # Create the document list from the pasted text
-    try:
-        with open("temp.txt", "w") as f:
-            f.write(document_text)
-        documents = SimpleDirectoryReader("temp.txt").load_data()
-        logger.info("Document loaded successfully with SimpleDirectoryReader")
-    except Exception as e:
-        logger.error("Failed to load document with SimpleDirectoryReader:", exc_info=True)
-        st.error("An error occurred while loading the document.")
-    
     try:
-        if not os.path.exists(PERSIST_DIR):
-            index = VectorStoreIndex.from_documents(documents)
-            index.storage_context.persist(persist_dir=PERSIST_DIR)
-            logger.info("Index created and stored successfully")
-        else:
-            storage_context = StorageContext.from_defaults(persist_dir=PERSIST_DIR)
-            index = VectorStoreIndex.load(storage_context=storage_context)
-            logger.info("Index loaded successfully from storage")
-        
+        # Load the index stored for exactly this text, or build and store it; the session
+        # keeps it so reruns for the same text don't read it from disk again
+        doc_hash = document_hash(document_text)
+        if st.session_state.get("search_doc_hash") != doc_hash:
+            storage = get_index_storage()
+            index, _ = storage.load(doc_hash)
+            if index is None:
+                index = VectorStoreIndex.from_documents([Document(text=document_text)])
+                storage.save(doc_hash, index, fingerprint_chunks([document_text]))
+                logger.info("Index created and stored successfully")
+            else:
+                logger.info("Index loaded successfully from storage")
+            st.session_state.search_index = index
+            st.session_state.search_doc_hash = doc_hash
+        index = st.session_state.search_index
+
         # Initialize the query engine
         query_engine = index.as_query_engine()
         logger.info("Query engine initialized successfully")
@@ -1,17 +1,23 @@
 import os
 import streamlit as st
 import json
+import hashlib
 import pandas as pd
 from dotenv import load_dotenv
 from langchain.prompts import PromptTemplate
 from langchain.chat_models import ChatOpenAI
-from langchain.embeddings.openai import OpenAIEmbeddings
 from langchain.vectorstores.chroma import Chroma
 from langchain.document_loaders import PyPDFLoader
 from pydantic import BaseModel, Field
 from langchain.schema.runnable import RunnablePassthrough
 from langchain.schema import StrOutputParser
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from embedbackend import get_backend
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +30,10 @@ gptomini = "gpt-4o-mini"
 # Set the default model
 default_model = gptomini
 
+# Chroma collections and classification results persist here, keyed by the PDF's content hash
+CHROMA_DIR = "chroma_db"
+CLASSIFICATION_DIR = os.path.join("cache", "classifications")
+
 class OpenAIStreamlitApp:
     def __init__(self):
         # Initialize the OpenAI client with the API key from the environment variable
@@ -43,14 +53,29 @@ class OpenAIStreamlitApp:
         )
         return response.choices[0].message.content
 
-def process_and_classify_document(filename):
-    loader = PyPDFLoader(filename)
-    pages = loader.load_and_split()
-
-    ids = [str(i) for i in range(1, len(pages) + 1)]
-
-    embeddings = OpenAIEmbeddings()
-    vectordb = Chroma.from_documents(pages, embeddings, ids=ids)
+def get_vectordb(file_bytes, file_hash):
+    """Open the persisted Chroma collection for this PDF, embedding it only the first time it is seen."""
+    # OpenAI by default, or local CPU embeddings with EMBED_BACKEND=local
+    embeddings = get_backend()
+    vectordb = Chroma(
+        collection_name=f"doc_{embeddings.name}_{file_hash[:32]}",
+        embedding_function=embeddings,
+        persist_directory=CHROMA_DIR,
+    )
+    if vectordb._collection.count() == 0:
+        temp_path = f"temp_{file_hash[:16]}.pdf"
+        with open(temp_path, 'wb') as f:
+            f.write(file_bytes)
+        try:
+            pages = PyPDFLoader(temp_path).load_and_split()
+        finally:
+            os.remove(temp_path)
+        ids = [str(i) for i in range(1, len(pages) + 1)]
+        vectordb.add_documents(pages, ids=ids)
+    return vectordb
+
+def process_and_classify_document(file_bytes, file_hash):
+    vectordb = get_vectordb(file_bytes, file_hash)
     retriever = vectordb.as_retriever()
 
     schema = ScienceDirectDocument.model_json_schema()
@@ -73,11 +98,23 @@ def process_and_classify_document(filename):
         | StrOutputParser()
     )
     output = json.loads(rag_chain.invoke(str(schema)))
-    vectordb._collection.delete(ids=[ids[-1]])
     return output
 
-def send_request(fileobj):
-    json_output = process_and_classify_document(filename=fileobj)
+def classify_document(file_bytes, file_hash):
+    """Return the classification for this PDF, running the RAG chain only if it was never stored."""
+    path = os.path.join(CLASSIFICATION_DIR, f"{file_hash}.json")
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    output = process_and_classify_document(file_bytes, file_hash)
+    os.makedirs(CLASSIFICATION_DIR, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(output, f, indent=2)
+    return output
+
+def send_request(file_bytes):
+    file_hash = hashlib.sha256(file_bytes).hexdigest()
+    json_output = classify_document(file_bytes, file_hash)
     table_output = pd.DataFrame(list(json_output.items()), columns=['Key', 'Value'])
     return json_output, table_output
 
@@ -87,12 +124,10 @@ def main():
     uploaded_file = st.file_uploader("Choose a PDF file", type="pdf")
     
     if uploaded_file is not None:
-        with open(f"temp_{uploaded_file.name}", 'wb') as f:
-            f.write(uploaded_file.getvalue())
-        
         st.write(f"Processing file: {uploaded_file.name}")
         
-        json_output, table_output = send_request(f"temp_{uploaded_file.name}")
+        # Reruns on the same file reuse the stored collection and classification, so cost no API calls
+        json_output, table_output = send_request(uploaded_file.getvalue())
         
         st.subheader("JSON Output")
         st.json(json_output)
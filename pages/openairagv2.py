@@ -1,10 +1,15 @@
 import os
 import streamlit as st
-from openai import OpenAI
 from llama_index import VectorStoreIndex, Document, SimpleDirectoryReader, ServiceContext
-from PyPDF2 import PdfReader
 from dotenv import load_dotenv
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pdfstream import iter_pdf_pages
+from clientpool import get_client
+
 # Models for text generation
 gpt35 = "gpt-3.5-turbo"
 gpt4t = "gpt-4-turbo"
@@ -15,26 +20,37 @@ gptomini = "gpt-4o-mini"
 # Set the default model here
 default_model = gptomini
 
+# Pages chunked and embedded together, so embedding requests stay batched while pages stream in
+PAGES_PER_BATCH = 32
+
 class OpenAIRAGApp:
     def __init__(self):
         # Initialize the OpenAI client with the API key from the environment variable
         load_dotenv()
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = get_client()
 
-    def load_pdf_text(self, pdf_file):
-        """Extract text from a PDF file."""
-        reader = PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-        return text
+    def load_pdf_documents(self, pdf_file):
+        """Yield one Document per PDF page as soon as that page has been extracted."""
+        for page_number, text in iter_pdf_pages(pdf_file):
+            if text.strip():
+                yield Document(text=text, metadata={"page_number": page_number})
 
     def perform_rag(self, documents, query, model):
         """Perform RAG using the loaded documents and the query."""
         # Initialize ServiceContext if needed
         service_context = ServiceContext.from_defaults()
 
-        index = VectorStoreIndex.from_documents(documents, service_context=service_context)
+        # Insert pages a batch at a time: extraction still streams, and each batch's nodes
+        # are embedded in embed_batch_size requests instead of one request per page
+        index = VectorStoreIndex([], service_context=service_context)
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) == PAGES_PER_BATCH:
+                index.insert_nodes(service_context.node_parser.get_nodes_from_documents(batch))
+                batch = []
+        if batch:
+            index.insert_nodes(service_context.node_parser.get_nodes_from_documents(batch))
         query_engine = index.as_query_engine()
         response = query_engine.query(query)
         return response
@@ -50,9 +66,8 @@ class OpenAIRAGApp:
         if input_type == "PDF File":
             uploaded_file = st.file_uploader("Upload a PDF file", type="pdf")
             if uploaded_file is not None:
-                pdf_text = self.load_pdf_text(uploaded_file)
-                documents = [Document(text=pdf_text)]
-                st.success("PDF file successfully loaded and processed.")
+                documents = self.load_pdf_documents(uploaded_file)
+                st.success("PDF file loaded; pages are extracted as they are indexed.")
             else:
                 st.info("Please upload a PDF file.")
 
@@ -1,7 +1,12 @@
 import os
 import streamlit as st
 from PIL import Image, ImageDraw
-from openai import OpenAI
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from chatstream import ChatStream
 
 # Models for text generation
 gpt35 = "gpt-3.5-turbo"
@@ -12,8 +17,8 @@ gptomini = "gpt-4o-mini"
 
 class OpenAIStreamlitApp:
     def __init__(self):
-        # Initialize the OpenAI client with the API key from the environment variable
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Shared, pooled OpenAI client (API key from the environment variable)
+        self.client = get_client()
 
     def draw_rectangle(self, image_path, coords):
         """Draws a rectangle on the image based on the given coordinates."""
@@ -33,6 +38,10 @@ class OpenAIStreamlitApp:
         )
         return response.choices[0].message['content']
 
+    def stream_text(self, prompt, model):
+        """Streams the GPT response; iterate it (e.g. with st.write_stream) to receive text as it arrives."""
+        return ChatStream(self.client, model, [{"role": "user", "content": prompt}], max_tokens=150)
+
     def run(self):
         st.title('Image Text Box Drawer and Text Generator')
 
@@ -72,8 +81,10 @@ class OpenAIStreamlitApp:
                 st.error("Please enter some prompt text.")
             else:
                 try:
-                    generated_text = self.generate_text(prompt_text, model_choice)
-                    st.text_area("Generated Text:", value=generated_text, height=300)
+                    # Render the response as it streams in
+                    stream = self.stream_text(prompt_text, model_choice)
+                    st.write_stream(stream)
+                    st.caption(stream.summary())
                     st.success("Text generated successfully.")
                 except Exception as e:
                     st.error(f"Error generating text: {e}")
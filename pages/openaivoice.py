@@ -1,11 +1,16 @@
 import os
 import streamlit as st
-from openai import OpenAI
 from pathlib import Path
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from audiocache import get_audio_cache
+
 # Load OpenAI API key from the environment variable
 openai_api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+client = get_client(openai_api_key)
 
 # List of OpenAI voices
 voices = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
@@ -13,15 +18,17 @@ voices = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
 # List of available TTS models
 tts_models = ["tts-1", "tts-1-hd"]
 
-# Function to generate audio from text
+# Function to generate audio from text, reusing cached audio for text already synthesized
 def generate_audio(text, voice, model, file_path):
-    response = client.audio.speech.create(
-        model=model,
-        voice=voice,
-        input=text
-    )
-    response.stream_to_file(file_path)
-    return file_path
+    def create(path):
+        response = client.audio.speech.create(
+            model=model,
+            voice=voice,
+            input=text
+        )
+        response.stream_to_file(path)
+
+    return get_audio_cache().fetch(model, voice, text, file_path, create)
 
 # Streamlit UI
 st.title("OpenAI Text-to-Speech (TTS) with Voice and Model Selection")
@@ -49,3 +56,9 @@ if st.button("Generate and Play Audio"):
             st.success("Audio generated successfully.")
         except Exception as e:
             st.error(f"Error generating audio: {e}")
+
+audio_stats = get_audio_cache().stats()
+st.sidebar.caption(
+    f"Audio cache: {audio_stats['entries']} clips, {audio_stats['bytes'] / 1e6:.1f} MB, "
+    f"{audio_stats['hits']} hits / {audio_stats['misses']} misses"
+)
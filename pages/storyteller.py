@@ -1,9 +1,15 @@
 import os
 import streamlit as st
-from openai import OpenAI
 
-# Initialize the OpenAI client with the API key from the environment variable
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from chatstream import ChatStream
+from chathistory import RollingHistory
+
+# Shared, pooled OpenAI client (API key from the environment variable)
+client = get_client()
 
 # Set a default model
 model = "gpt-4o-mini"
@@ -58,6 +64,10 @@ else:
             {"role": "system", "content": f"You are {st.session_state.character['name']}, a {st.session_state.character['class']} from the {st.session_state.character['race']} race. Your journey begins now."}
         ]
 
+    # Recent story turns verbatim plus a background-updated summary of older ones
+    if "story_history" not in st.session_state:
+        st.session_state.story_history = RollingHistory(client, model)
+
     # Display story messages
     for message in st.session_state.story:
         with st.container():
@@ -82,23 +92,27 @@ else:
                 with st.container():
                     st.markdown(f"**You:** {user_action}")
 
-                # Generate story continuation using GPT-4o-mini
+                # Generate story continuation using GPT-4o-mini, rendering tokens as they arrive
                 try:
-                    response = client.chat.completions.create(
-                        model=model,
-                        messages=[
+                    stream = ChatStream(
+                        client,
+                        model,
+                        [
                             {"role": "system", "content": f"You are a {st.session_state.character['class']} named {st.session_state.character['name']} from the {st.session_state.character['race']} race."},
-                            *st.session_state.story
+                            *st.session_state.story_history.build_messages(st.session_state.story)
                         ],
                         max_tokens=2000
-                    ).choices[0].message.content
+                    )
 
                     # Display AI response in the story
                     with st.container():
-                        st.markdown(f"**Narrator:** {response}")
+                        st.markdown("**Narrator:**")
+                        st.write_stream(stream)
+                        st.caption(stream.summary())
 
-                    # Add response to the story history
-                    st.session_state.story.append({"role": "assistant", "content": response})
+                    # Add the full response to the story history
+                    st.session_state.story.append({"role": "assistant", "content": stream.text})
+                    st.session_state.story_history.maybe_summarize(st.session_state.story)
 
                 except Exception as e:
                     st.error(f"Error generating response: {e}")
@@ -109,5 +123,6 @@ else:
     if st.button("End Adventure"):
         st.write("**Your adventure has come to an end. Thank you for playing!**")
         st.session_state.story.clear()
+        st.session_state.story_history.reset()
         st.session_state.character_created = False
         st.rerun()
@@ -1,12 +1,17 @@
 import os
 import streamlit as st
 from pydantic import BaseModel
-from openai import OpenAI
 import json
 
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from structstream import stream_structured_items
+
 # Load OpenAI API key from the environment variable
 openai_api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+client = get_client(openai_api_key)
 
 # Define the schema using Pydantic for multiple dialogues
 class DialogueLine(BaseModel):
@@ -36,24 +41,27 @@ if st.button("Generate Structured Dialogue"):
         )
 
         try:
-            # API call with structured output
-            completion = client.beta.chat.completions.parse(
-                model=gptomini,
-                messages=[
+            # Streamed API call with structured output; each line is shown as soon as it is complete
+            lines = stream_structured_items(
+                client,
+                gptomini,
+                [
                     {"role": "system", "content": "Extract and structure the dialogue information."},
                     {"role": "user", "content": prompt},
                 ],
                 response_format=StructuredDialogue,
+                item_model=DialogueLine,
+                array_key="dialogues",
             )
-            
-            # Access the parsed response
-            structured_dialogue = completion.choices[0].message.parsed
 
             # Streamlit display for each dialogue
             st.write("### Parsed Dialogue:")
-            for dialogue in structured_dialogue.dialogues:
+            dialogues = []
+            for dialogue in lines:
+                dialogues.append(dialogue)
                 st.write(f"**Speaker**: {dialogue.speaker}")
                 st.write(f"**Dialogue**: {dialogue.dialogue}")
+            structured_dialogue = StructuredDialogue(dialogues=dialogues)
 
             # Show the real structured output for TTS or other processes
             st.write("### Structured Output for Processing:")
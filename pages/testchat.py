@@ -1,9 +1,15 @@
 import os
 import streamlit as st
-from openai import OpenAI
 
-# Initialize the OpenAI client with the API key from the environment variable
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from chatstream import ChatStream
+from chathistory import RollingHistory
+
+# Shared, pooled OpenAI client (API key from the environment variable)
+client = get_client()
 
 # Set a default model
 model = "gpt-4o-mini"
@@ -14,6 +20,10 @@ st.title("Chat with GPT-4o-mini")
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
+# Recent turns verbatim plus a background-updated summary of older ones
+if "history" not in st.session_state:
+    st.session_state.history = RollingHistory(client, model)
+
 # Display chat messages from history on app rerun
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -28,23 +38,23 @@ if prompt := st.chat_input("Enter your message"):
     with st.chat_message("user"):
         st.markdown(prompt)
     
-    # Generate assistant response using GPT-4o-mini
+    # Generate assistant response using GPT-4o-mini, rendering tokens as they arrive
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": m["role"], "content": m["content"]}
-                for m in st.session_state.messages
-            ],
+        stream = ChatStream(
+            client,
+            model,
+            st.session_state.history.build_messages(st.session_state.messages),
             max_tokens=150
-        ).choices[0].message.content
-        
+        )
+
         # Display assistant response in chat message container
         with st.chat_message("assistant"):
-            st.markdown(response)
-        
-        # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
+            st.write_stream(stream)
+            st.caption(stream.summary())
+
+        # Add the full assistant response to chat history
+        st.session_state.messages.append({"role": "assistant", "content": stream.text})
+        st.session_state.history.maybe_summarize(st.session_state.messages)
     
     except Exception as e:
         st.error(f"Error generating response: {e}")
@@ -1,12 +1,22 @@
 import os
 import json
+import time
 import streamlit as st
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from openai import OpenAI
+
+# Add the root directory to the Python path
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from clientpool import get_client
+from audiocache import get_audio_cache
 
 class TTSVoiceGen:
-    def __init__(self, api_key, tts_models=None, voices=None, json_file="speakers.json"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key, tts_models=None, voices=None, json_file="speakers.json", audio_cache=None):
+        self.client = get_client(api_key)
+        # Identical (model, voice, text) lines are served from disk instead of the API
+        self.audio_cache = audio_cache or get_audio_cache()
         self.tts_models = tts_models or ["tts-1"]
         self.voices = voices or ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
         self.json_file = Path(json_file)
@@ -33,7 +43,8 @@ class TTSVoiceGen:
         }
         self.save_speakers()
 
-    def generate_audio(self, speaker_name, text, file_path):
+    def resolve_voice(self, speaker_name):
+        """Returns the (model, voice) used for a speaker, falling back to the default speaker."""
         # Ensure we're always using the correct model
         speaker = self.speakers.get(speaker_name, self.speakers.get("default"))
         
@@ -41,8 +52,22 @@ class TTSVoiceGen:
             raise ValueError(f"No configuration found for speaker '{speaker_name}' and no default speaker configured.")
 
         # Hardcode the model to "tts-1" to avoid any issues
-        model = "tts-1"
-        voice = speaker["voice"]
+        return "tts-1", speaker["voice"]
+
+    def synthesize(self, model, voice, text, file_path):
+        """Generates speech for text into file_path. No Streamlit calls, so it is safe from worker threads."""
+        def create(path):
+            response = self.client.audio.speech.create(
+                model=model,
+                voice=voice,
+                input=text
+            )
+            response.stream_to_file(path)
+
+        return self.audio_cache.fetch(model, voice, text, file_path, create)
+
+    def generate_audio(self, speaker_name, text, file_path):
+        model, voice = self.resolve_voice(speaker_name)
 
         verbose_output = (
             f"Attempting to generate audio with the following parameters:\n"
@@ -51,17 +76,67 @@ class TTSVoiceGen:
         st.write(verbose_output)  # Show the parameters in Streamlit before trying to generate audio
 
         try:
-            response = self.client.audio.speech.create(
-                model=model,
-                voice=voice,
-                input=text
-            )
-            response.stream_to_file(file_path)
+            self.synthesize(model, voice, text, file_path)
             st.success("Audio generated successfully.")
             return file_path
         except Exception as e:
             raise RuntimeError(f"Failed to generate audio for {speaker_name}: {e}\n{verbose_output}")
 
+    def _generate_line(self, index, speaker_name, text, output_dir, retries, backoff):
+        result = {
+            "index": index,
+            "speaker": speaker_name,
+            "text": text,
+            "file_path": Path(output_dir) / f"{index:03d}_{speaker_name}_audio.mp3",
+            "model": None,
+            "voice": None,
+            "attempts": 0,
+            "seconds": 0.0,
+            "error": None,
+        }
+        start = time.perf_counter()
+        try:
+            model, voice = self.resolve_voice(speaker_name)
+        except ValueError as e:
+            result["error"] = str(e)
+            return result
+        result["model"], result["voice"] = model, voice
+        for attempt in range(retries + 1):
+            result["attempts"] = attempt + 1
+            try:
+                self.synthesize(model, voice, text, result["file_path"])
+                result["error"] = None
+                break
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                if attempt < retries:
+                    time.sleep(backoff * 2 ** attempt)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def generate_audio_batch(self, lines, output_dir, max_workers=4, retries=2, backoff=0.5):
+        """Generates audio for many (speaker, text) lines, at most max_workers at a time.
+
+        lines may be a generator, e.g. dialogue lines still streaming in: synthesis of each line
+        starts as soon as it arrives. Yields one result dict per line in script order, each as soon
+        as it and every line before it are done, so playback can start before the batch finishes.
+        A result holds file_path, attempts, seconds and error (None on success); a failed line is
+        retried with exponential backoff and never stops the rest of the batch.
+        """
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            try:
+                for index, (speaker_name, text) in enumerate(lines):
+                    pending.append(pool.submit(self._generate_line, index, speaker_name, text, output_dir, retries, backoff))
+                    while pending and pending[0].done():
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # The caller stopped early; don't start lines nobody will play
+                for future in pending:
+                    future.cancel()
+
     def list_speakers(self):
         return list(self.speakers.keys())
 
@@ -82,6 +157,12 @@ if __name__ == "__main__":
     
     st.title("TTS Voice Generator Management")
 
+    audio_stats = tts_voicegen.audio_cache.stats()
+    st.sidebar.caption(
+        f"Audio cache: {audio_stats['entries']} clips, {audio_stats['bytes'] / 1e6:.1f} MB, "
+        f"{audio_stats['hits']} hits / {audio_stats['misses']} misses"
+    )
+
     # Show existing speakers
     st.write("## Current Speakers")
     for speaker_name, info in tts_voicegen.speakers.items():
@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PyPDF2 import PdfReader
+
+_worker_reader = None
+
+
+def _read_bytes(pdf_file):
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            return f.read()
+    if hasattr(pdf_file, "getvalue"):
+        return pdf_file.getvalue()
+    return pdf_file.read()
+
+
+def _init_worker(data):
+    # Each worker parses the PDF once and reuses it for every page range it is given
+    global _worker_reader
+    _worker_reader = PdfReader(BytesIO(data))
+
+
+def _extract_range(start, end):
+    return [(i + 1, _worker_reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+
+def iter_pdf_pages(pdf_file, workers=None, pool_threshold=64, pages_per_task=16):
+    """Yield (page_number, text) for each page of a PDF, in page order, as soon as it is extracted.
+
+    pdf_file can be a path, a file-like object or a Streamlit UploadedFile. PDFs with at
+    least pool_threshold pages are split into ranges of pages_per_task pages and extracted
+    in a process pool; smaller ones are extracted in this process.
+    """
+    data = _read_bytes(pdf_file)
+    reader = PdfReader(BytesIO(data))
+    page_count = len(reader.pages)
+    if (workers or os.cpu_count() or 1) == 1 or page_count < pool_threshold:
+        for i, page in enumerate(reader.pages, start=1):
+            yield i, page.extract_text() or ""
+        return
+
+    del reader
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as executor:
+        futures = [
+            executor.submit(_extract_range, start, min(start + pages_per_task, page_count))
+            for start in range(0, page_count, pages_per_task)
+        ]
+        for future in futures:
+            yield from future.result()
+
+
+def make_synthetic_pdf(path, page_count, lines_per_page=40):
+    """Write a plain-text PDF with page_count pages, for benchmarking."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(1, page_count + 1):
+        lines = b"".join(
+            b"(Page %d line %d: the somatosensory system detects touch, pressure and pain.) Tj T* " % (page, line)
+            for line in range(lines_per_page)
+        )
+        stream = b"BT /F1 10 Tf 12 TL 40 780 Td " + lines + b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    with open(path, "wb") as f:
+        f.write(out.getvalue())
+
+
+if __name__ == "__main__":
+    # Benchmark: old concatenating loader vs streaming, serial and process pool
+    import tempfile
+    import time
+
+    def concat_loader(path):
+        text = ""
+        for page in PdfReader(path).pages:
+            text += page.extract_text()
+        return text
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = os.path.join(tmp, "synthetic.pdf")
+        make_synthetic_pdf(synthetic, 1000)
+        sample = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "somatosensory.pdf")
+        for path in (sample, synthetic):
+            pages = len(PdfReader(path).pages)
+            print(f"{os.path.basename(path)} ({pages} pages)")
+            start = time.perf_counter()
+            concat_loader(path)
+            print(f"  text += extract_text():  {time.perf_counter() - start:7.2f} s")
+            start = time.perf_counter()
+            first = None
+            for number, text in iter_pdf_pages(path, workers=1):
+                first = first or time.perf_counter() - start
+            print(f"  streaming, serial:       {time.perf_counter() - start:7.2f} s (first page {first * 1000:.0f} ms)")
+            start = time.perf_counter()
+            first = None
+            for number, text in iter_pdf_pages(path, workers=4, pool_threshold=1):
+                first = first or time.perf_counter() - start
+            print(f"  streaming, 4 processes:{time.perf_counter() - start:7.2f} s (first page {first * 1000:.0f} ms)")
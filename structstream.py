@@ -0,0 +1,85 @@
+import json
+
+
+class JSONArrayItemParser:
+    """Incremental parser that pulls complete objects out of one array in a streamed JSON document.
+
+    Feed it the response text chunk by chunk; feed() returns each object of the array under
+    array_key (in the top-level object) as soon as its closing brace arrives, e.g. each
+    dialogue line of {"dialogues": [{...}, {...}]} while the rest is still being written.
+    Only string state and nesting depth are tracked, so each character is looked at once.
+    """
+
+    def __init__(self, array_key):
+        self.array_key = array_key
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.array_depth = None  # depth inside the target array, once it opens
+        self.last_string = None  # last complete string at the top level, i.e. the current key
+        self._string = []
+        self._item = []
+
+    def feed(self, text):
+        items = []
+        for char in text:
+            if self._item:
+                self._item.append(char)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self.last_string = "".join(self._string)
+                elif self.depth == 1:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self._string = []
+            elif char in "{[":
+                self.depth += 1
+                if char == "[" and self.depth == 2 and self.last_string == self.array_key:
+                    self.array_depth = self.depth
+                elif char == "{" and self.array_depth is not None and self.depth == self.array_depth + 1:
+                    self._item = [char]
+            elif char in "}]":
+                if char == "}" and self._item and self.depth == self.array_depth + 1:
+                    items.append(json.loads("".join(self._item)))
+                    self._item = []
+                elif char == "]" and self.depth == self.array_depth:
+                    self.array_depth = None
+                self.depth -= 1
+        return items
+
+
+def stream_structured_items(client, model, messages, response_format, item_model, array_key, **kwargs):
+    """Request a structured output and yield item_model instances from its array_key list as they complete.
+
+    Uses the same response_format schema as a blocking parse() call, so the final document
+    validates against it; the items just become available while it is being generated.
+    """
+    parser = JSONArrayItemParser(array_key)
+    with client.beta.chat.completions.stream(
+        model=model, messages=messages, response_format=response_format, **kwargs
+    ) as stream:
+        for event in stream:
+            if event.type == "content.delta":
+                for item in parser.feed(event.delta):
+                    yield item_model(**item)
+
+
+if __name__ == "__main__":
+    # Feeds a document in small chunks and reports when each item becomes available
+    document = json.dumps({"dialogues": [
+        {"speaker": f"Speaker {i}", "dialogue": f"Line {i} with \"quotes\", {{braces}} and [brackets]"}
+        for i in range(20)
+    ]})
+    parser = JSONArrayItemParser("dialogues")
+    for position in range(0, len(document), 7):
+        for item in parser.feed(document[position:position + 7]):
+            print(f"{item['speaker']:>10} complete after {position + 7:>5} of {len(document)} characters")
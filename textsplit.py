@@ -0,0 +1,97 @@
+from collections import deque
+
+from tokencount import get_encoding
+
+
+class TextSplitter:
+    """Single-pass splitter that packs separator-delimited pieces into overlapping chunks.
+
+    Sizes are measured with length_function (characters by default) or, when model is
+    given, in that model's tokens. Pieces are measured once each, so a chunk's size is
+    the sum of its pieces' sizes. Pieces larger than chunk_size are split again on spaces
+    and, failing that, cut by characters.
+    """
+
+    def __init__(self, separator="\n", chunk_size=500, chunk_overlap=100, length_function=len, model=None):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.separator = separator
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length_function = length_function
+        if model is not None:
+            encoding = get_encoding(model)
+            self.length_function = lambda text: len(encoding.encode_ordinary(text))
+
+    def _measure(self, text, start, end):
+        # Character lengths come straight from the offsets, without copying the piece
+        if self.length_function is len:
+            return end - start
+        return self.length_function(text[start:end])
+
+    def _pieces(self, text, start, end, separators):
+        """Yield (start, end, size) pieces covering text[start:end], each no larger than chunk_size."""
+        separator, rest = separators[0], separators[1:]
+        pos = start
+        while pos < end:
+            found = text.find(separator, pos, end)
+            piece_end = end if found == -1 else found + len(separator)
+            size = self._measure(text, pos, piece_end)
+            if size <= self.chunk_size:
+                yield pos, piece_end, size
+            elif rest:
+                yield from self._pieces(text, pos, piece_end, rest)
+            else:
+                for cut in range(pos, piece_end, self.chunk_size):
+                    cut_end = min(cut + self.chunk_size, piece_end)
+                    yield cut, cut_end, self._measure(text, cut, cut_end)
+            pos = piece_end
+
+    def split_spans(self, text, start=0, end=None):
+        """Return (start, end) offsets of each chunk of text[start:end], trimmed of surrounding whitespace."""
+        end = len(text) if end is None else end
+        separators = [self.separator, " "] if self.separator not in ("", " ") else [" "]
+        spans = []
+        window = deque()
+        total = 0
+
+        def emit():
+            s, e = window[0][0], window[-1][1]
+            while s < e and text[s].isspace():
+                s += 1
+            while e > s and text[e - 1].isspace():
+                e -= 1
+            if s < e:
+                spans.append((s, e))
+
+        for piece in self._pieces(text, start, end, separators):
+            if window and total + piece[2] > self.chunk_size:
+                emit()
+                # Keep a tail of the previous chunk as overlap, as long as the new piece still fits
+                while window and (total > self.chunk_overlap or total + piece[2] > self.chunk_size):
+                    total -= window.popleft()[2]
+            window.append(piece)
+            total += piece[2]
+        if window:
+            emit()
+        return spans
+
+    def split_text(self, text):
+        return [text[s:e] for s, e in self.split_spans(text)]
+
+
+if __name__ == "__main__":
+    # Benchmark: character and token splitting of a 100 MB input
+    import time
+
+    paragraph = ("The somatosensory system detects touch, temperature, pain and body position. " * 6 + "\n") * 4 + "\n"
+    text = paragraph * (100_000_000 // len(paragraph))
+    print(f"input: {len(text) / 1e6:.0f} MB")
+    for label, splitter in (
+        ("characters", TextSplitter(chunk_size=500, chunk_overlap=100)),
+        ("tokens", TextSplitter(chunk_size=256, chunk_overlap=32, model="text-embedding-3-small")),
+    ):
+        start = time.perf_counter()
+        spans = splitter.split_spans(text)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {len(spans):>9} chunks in {elapsed:6.2f} s ({len(text) / 1e6 / elapsed:.0f} MB/s)")
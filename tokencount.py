@@ -0,0 +1,60 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import tiktoken
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model):
+    """Resolve a model's tokenizer once per process."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+class TokenCountMemo:
+    """Bounded LRU memo of token counts, keyed by (encoding name, text)."""
+
+    def __init__(self, max_entries=50_000):
+        self.max_entries = max_entries
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def put(self, key, count):
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+
+_memo = TokenCountMemo()
+
+
+def count_tokens(text, model="gpt-4o-mini"):
+    return count_tokens_batch([text], model=model)[0]
+
+
+def count_tokens_batch(texts, model="gpt-4o-mini", num_threads=8):
+    """Count tokens for many texts, encoding the ones not already memoized in a thread pool."""
+    encoding = get_encoding(model)
+    counts = [_memo.get((encoding.name, text)) for text in texts]
+    missing = list(dict.fromkeys(text for text, count in zip(texts, counts) if count is None))
+    if missing:
+        encoded = encoding.encode_ordinary_batch(missing, num_threads=num_threads)
+        fresh = {text: len(tokens) for text, tokens in zip(missing, encoded)}
+        for text, count in fresh.items():
+            _memo.put((encoding.name, text), count)
+        counts = [count if count is not None else fresh[text] for text, count in zip(texts, counts)]
+    return counts
@@ -0,0 +1,82 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ToolRuntime:
+    """Python callables exposed to chat models as function tools.
+
+    Register callables with a JSON schema for their arguments, pass `tools` as the tools=
+    parameter, and let chat() run the conversation: when the model asks for several tools
+    in one turn they run concurrently in a thread pool, and all results go back to the
+    model in a single follow-up request. Every call is recorded in `calls` with its latency.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self.functions = {}
+        self.tools = []
+        self.calls = []
+
+    def register(self, func, name=None, description="", parameters=None):
+        name = name or func.__name__
+        self.functions[name] = func
+        self.tools.append({
+            "type": "function",
+            "function": {
+                "name": name,
+                "description": description,
+                "parameters": parameters or {"type": "object", "properties": {}},
+            },
+        })
+        return func
+
+    def _call(self, tool_call):
+        name = tool_call.function.name
+        start = time.perf_counter()
+        error = None
+        try:
+            func = self.functions[name]
+            result = func(**json.loads(tool_call.function.arguments or "{}"))
+        except Exception as e:
+            # Report the failure to the model instead of aborting the whole turn
+            error = f"{type(e).__name__}: {e}"
+            result = {"error": error}
+        record = {
+            "tool": name,
+            "arguments": tool_call.function.arguments,
+            "seconds": time.perf_counter() - start,
+            "error": error,
+        }
+        content = result if isinstance(result, str) else json.dumps(result)
+        return {"role": "tool", "tool_call_id": tool_call.id, "content": content}, record
+
+    def run_calls(self, tool_calls):
+        """Run one turn's tool calls concurrently and return their tool messages in call order."""
+        if len(tool_calls) == 1:
+            outcomes = [self._call(tool_calls[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tool_calls))) as pool:
+                outcomes = list(pool.map(self._call, tool_calls))
+        self.calls.extend(record for _, record in outcomes)
+        return [message for message, _ in outcomes]
+
+    def chat(self, client, model, messages, max_rounds=5, **kwargs):
+        """Complete a chat, running any requested tools, and return the final assistant text."""
+        messages = list(messages)
+        for _ in range(max_rounds):
+            message = client.chat.completions.create(
+                model=model, messages=messages, tools=self.tools, **kwargs
+            ).choices[0].message
+            if not message.tool_calls:
+                return message.content
+            messages.append({
+                "role": "assistant",
+                "content": message.content,
+                "tool_calls": [tool_call.model_dump() for tool_call in message.tool_calls],
+            })
+            messages.extend(self.run_calls(message.tool_calls))
+        # Out of rounds: ask for an answer from the results gathered so far
+        return client.chat.completions.create(
+            model=model, messages=messages, tools=self.tools, tool_choice="none", **kwargs
+        ).choices[0].message.content
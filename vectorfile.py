@@ -0,0 +1,121 @@
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+# File layout (all integers little-endian):
+#   header      64 bytes, see HEADER below
+#   vectors     count x dim values of float32 or float16, starting on a 64-byte boundary
+#   table       one JSON object per row: {"id": chunk_id, "metadata": {...}}
+#   offsets     count + 1 uint64 offsets of each table row, relative to the table start
+MAGIC = b"VECF"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxIQQQQ20x")
+DTYPES = {0: np.float32, 1: np.float16}
+DTYPE_CODES = {"float32": 0, "float16": 1}
+
+
+def _align(offset, alignment=64):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def write_vector_file(path, vectors, ids, metadatas=None, dtype="float32"):
+    """Write vectors plus a row -> (chunk id, metadata) table. The file is replaced atomically."""
+    vectors = np.ascontiguousarray(vectors, dtype=DTYPES[DTYPE_CODES[dtype]])
+    if vectors.ndim != 2 or len(vectors) != len(ids):
+        raise ValueError("vectors must be a 2-D array with one row per id")
+    count, dim = vectors.shape
+    metadatas = metadatas or [{}] * count
+
+    rows = [
+        json.dumps({"id": chunk_id, "metadata": metadata}, separators=(",", ":")).encode("utf-8")
+        for chunk_id, metadata in zip(ids, metadatas)
+    ]
+    offsets = np.zeros(count + 1, dtype="<u8")
+    np.cumsum([len(row) for row in rows], out=offsets[1:])
+
+    vectors_offset = _align(HEADER.size)
+    table_offset = vectors_offset + vectors.nbytes
+    offsets_offset = _align(table_offset + int(offsets[-1]), 8)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, DTYPE_CODES[dtype], dim, count,
+                            vectors_offset, table_offset, offsets_offset))
+        f.write(b"\0" * (vectors_offset - HEADER.size))
+        f.write(vectors.tobytes())
+        for row in rows:
+            f.write(row)
+        f.write(b"\0" * (offsets_offset - table_offset - int(offsets[-1])))
+        f.write(offsets.tobytes())
+    os.replace(tmp_path, path)
+
+
+class VectorFile:
+    """Read-only, memory-mapped view of a vector file.
+
+    Opening only parses the header; vectors and table rows are paged in by the OS on
+    access, and every process that opens the same file shares those pages.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, dtype_code, self.dim, self.count,
+         vectors_offset, self._table_offset, offsets_offset) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} vector file")
+        self.dtype = DTYPES[dtype_code]
+        self.vectors = np.frombuffer(self._mmap, dtype=self.dtype, count=self.count * self.dim,
+                                     offset=vectors_offset).reshape(self.count, self.dim)
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=self.count + 1, offset=offsets_offset)
+        self._id_to_row = None
+
+    def __len__(self):
+        return self.count
+
+    def record(self, row):
+        """Return {"id": ..., "metadata": ...} for a row."""
+        start = self._table_offset + int(self._offsets[row])
+        end = self._table_offset + int(self._offsets[row + 1])
+        return json.loads(self._mmap[start:end])
+
+    def row_for_id(self, chunk_id):
+        # The id lookup table is only built the first time it is needed
+        if self._id_to_row is None:
+            self._id_to_row = {self.record(row)["id"]: row for row in range(self.count)}
+        return self._id_to_row.get(chunk_id)
+
+    def close(self):
+        self.vectors = None
+        self._offsets = None
+        self._mmap.close()
+
+
+if __name__ == "__main__":
+    # Benchmark: write and open a million-vector float16 file
+    import tempfile
+    import time
+
+    n, dim = 1_000_000, 128
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.vec")
+        start = time.perf_counter()
+        write_vector_file(path, vectors, [f"chunk-{i}" for i in range(n)],
+                          [{"page_number": str(i // 10)} for i in range(n)], dtype="float16")
+        print(f"write {n} x {dim} float16: {time.perf_counter() - start:.2f} s, "
+              f"{os.path.getsize(path) / 1e6:.0f} MB")
+        start = time.perf_counter()
+        vf = VectorFile(path)
+        print(f"open: {(time.perf_counter() - start) * 1000:.2f} ms")
+        start = time.perf_counter()
+        vf.record(n - 1)
+        _ = vf.vectors[n // 2].astype(np.float32)
+        print(f"first record + vector access: {(time.perf_counter() - start) * 1000:.2f} ms")
+        vf.close()